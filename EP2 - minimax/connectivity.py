@@ -0,0 +1,94 @@
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
+              (0, -1),           (0, 1),
+              (1, -1),  (1, 0),  (1, 1)]
+
+_tables = {}
+
+
+def build_tables(board_size):
+    if board_size in _tables:
+        return _tables[board_size]
+
+    num_cells = board_size * board_size
+    # nós virtuais: depois das casas vêm as duas bordas de cada jogador
+    start_edge, end_edge = num_cells, num_cells + 1
+
+    neighbours = []
+    vertical_edges = []
+    horizontal_edges = []
+    for i in range(board_size):
+        for j in range(board_size):
+            neighbours.append([(i + di) * board_size + (j + dj) for di, dj in DIRECTIONS
+                               if 0 <= i + di < board_size and 0 <= j + dj < board_size])
+            vertical_edges.append([edge for edge, touches in ((start_edge, i == 0), (end_edge, i == board_size - 1)) if touches])
+            horizontal_edges.append([edge for edge, touches in ((start_edge, j == 0), (end_edge, j == board_size - 1)) if touches])
+
+    _tables[board_size] = (neighbours, vertical_edges, horizontal_edges)
+    return _tables[board_size]
+
+
+# union-find por jogador, atualizado a cada peça colocada. união por tamanho sem
+# compressão de caminho: cada união pode ser desfeita em ordem inversa (undo)
+class ConnectivityTracker:
+    def __init__(self, board_size, vertical_player, horizontal_player):
+        self.board_size = board_size
+        self.num_cells = board_size * board_size
+        self.neighbours, vertical_edges, horizontal_edges = build_tables(board_size)
+        self.edges = {vertical_player: vertical_edges, horizontal_player: horizontal_edges}
+        self.owner = [None] * self.num_cells
+        self.parent = {p: list(range(self.num_cells + 2)) for p in self.edges}
+        self.size = {p: [1] * (self.num_cells + 2) for p in self.edges}
+        self.history = []
+
+    def copy(self):
+        new_tracker = ConnectivityTracker.__new__(ConnectivityTracker)
+        new_tracker.board_size = self.board_size
+        new_tracker.num_cells = self.num_cells
+        new_tracker.neighbours = self.neighbours
+        new_tracker.edges = self.edges
+        new_tracker.owner = self.owner[:]
+        new_tracker.parent = {p: parent[:] for p, parent in self.parent.items()}
+        new_tracker.size = {p: size[:] for p, size in self.size.items()}
+        new_tracker.history = self.history[:]
+        return new_tracker
+
+    def find(self, player, node):
+        parent = self.parent[player]
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    def add(self, player, x, y):
+        cell = x * self.board_size + y
+        owner = self.owner
+        owner[cell] = player
+        parent = self.parent[player]
+        size = self.size[player]
+        merged = []
+
+        for other in self.neighbours[cell] + self.edges[player][cell]:
+            if other < self.num_cells and owner[other] != player:
+                continue
+            a = self.find(player, cell)
+            b = self.find(player, other)
+            if a == b:
+                continue
+            if size[a] < size[b]:
+                a, b = b, a
+            parent[b] = a
+            size[a] += size[b]
+            merged.append((a, b))
+
+        self.history.append((player, cell, merged))
+
+    def undo(self):
+        player, cell, merged = self.history.pop()
+        parent = self.parent[player]
+        size = self.size[player]
+        for a, b in reversed(merged):
+            parent[b] = b
+            size[a] -= size[b]
+        self.owner[cell] = None
+
+    def connected(self, player):
+        return self.find(player, self.num_cells) == self.find(player, self.num_cells + 1)
@@ -1,4 +1,5 @@
 from colorama import Fore, Style, init
+from connectivity import ConnectivityTracker
 import math
 
 init() # init colorama
@@ -19,6 +20,8 @@ class TwixtGame:
         self.current_player = PLAYER_1
         self.game_over = False
         self.winner = None
+        self.connections = ConnectivityTracker(BOARD_SIZE, PLAYER_1, PLAYER_2)
+        self.history = []
 
     def print_board(self):
         print("  " + " ".join(Fore.RED + str(i) + Style.RESET_ALL for i in range(BOARD_SIZE)))
@@ -50,6 +53,7 @@ class TwixtGame:
         if self.is_valid_move(x, y):
             #print(f"current player: {self.current_player}")
             self.board[x][y] = self.current_player
+            self.connections.add(self.current_player, x, y)
             if self.check_win():
                 self.game_over = True
                 self.winner = self.current_player
@@ -68,43 +72,8 @@ class TwixtGame:
         return False
 
     def check_win(self):
-        if self.current_player == PLAYER_1:
-            for start_y in range(BOARD_SIZE):
-                if self.board[0][start_y] == PLAYER_1:
-                    for end_y in range(BOARD_SIZE):
-                        if self.board[BOARD_SIZE-1][end_y] == PLAYER_1 and self.check_connection(0, start_y, BOARD_SIZE-1, end_y):
-                            return True
-        else:
-            for start_x in range(BOARD_SIZE):
-                if self.board[start_x][0] == PLAYER_2:
-                    for end_x in range(BOARD_SIZE):
-                        if self.board[end_x][BOARD_SIZE-1] == PLAYER_2 and self.check_connection(start_x, 0, end_x, BOARD_SIZE-1):
-                            return True
-                        
-            for start_x in range(BOARD_SIZE):
-                if self.board[start_x][BOARD_SIZE-1] == PLAYER_2:
-                    for end_x in range(BOARD_SIZE):
-                        if self.board[end_x][0] == PLAYER_2 and self.check_connection(start_x, BOARD_SIZE-1, end_x, 0):
-                            return True
-        return False
+        return self.connections.connected(self.current_player)
 
-    def check_connection(self, start_x, start_y, target_x, target_y):
-        visited = [[False for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-        nodes_to_visit = [(start_x, start_y)]
-        while nodes_to_visit:
-            cx, cy = nodes_to_visit.pop()
-            #print(f"visiting node: ({cx}, {cy})")
-            if cx == target_x and cy == target_y:
-                return True
-            if not visited[cx][cy]:
-                visited[cx][cy] = True
-                for dx, dy in DIRECTIONS:
-                    nx, ny = cx + dx, cy + dy
-                    if 0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and self.board[nx][ny] == self.current_player:
-                        visited[nx][ny] = True
-                        nodes_to_visit.append((nx, ny))
-        return False
-    
     def get_valid_moves(self):
         moves = []
         for i in range(BOARD_SIZE):
@@ -123,8 +92,10 @@ class TwixtGame:
         new_game.current_player = self.current_player
         new_game.game_over = self.game_over
         new_game.winner = self.winner
+        new_game.connections = self.connections.copy()
         
         new_game.board[x][y] = self.current_player
+        new_game.connections.add(self.current_player, x, y)
         if new_game.check_win():
             new_game.game_over = True
             new_game.winner = self.current_player
@@ -133,6 +104,23 @@ class TwixtGame:
         
         return new_game
     
+    # mesma regra do successor_func, mas no próprio tabuleiro; unmake_move desfaz
+    def make_move(self, move):
+        x, y = move
+        self.history.append((x, y, self.current_player, self.game_over, self.winner))
+        self.board[x][y] = self.current_player
+        self.connections.add(self.current_player, x, y)
+        if self.check_win():
+            self.game_over = True
+            self.winner = self.current_player
+        else:
+            self.current_player = PLAYER_2 if self.current_player == PLAYER_1 else PLAYER_1
+
+    def unmake_move(self):
+        x, y, self.current_player, self.game_over, self.winner = self.history.pop()
+        self.board[x][y] = EMPTY
+        self.connections.undo()
+    
     def is_game_over(self):
         return self.game_over
 
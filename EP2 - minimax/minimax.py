@@ -1,63 +1,129 @@
 from game import *
 import math
+import time
+
+class SearchTimeout(Exception):
+    pass
 
 class AIPlayer:
-    def __init__(self, game, player, depth=3):
+    def __init__(self, game, player, depth=3, time_budget_ms=None):
         self.game = game
         self.player = player
         self.depth = depth
+        self.time_budget_ms = time_budget_ms
+        self.deadline = None
+        # variação principal da iteração anterior e a que está sendo montada
+        self.pv_hint = []
+        self.pv_lines = None
     
-    def get_best_move(self):
-        best_move = None
-        best_value = -math.inf if self.game.current_player == self.player else math.inf
+    def get_best_move(self, time_budget_ms=None):
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
         
         legal_moves = self.game.get_valid_moves()
         if not legal_moves:
             return None
         
+        if time_budget_ms is None:
+            return self.search_root(self.depth, legal_moves)[0]
+        return self.iterative_deepening(legal_moves, time_budget_ms)
+    
+    def iterative_deepening(self, legal_moves, time_budget_ms):
+        best_move = legal_moves[0]
+        root_history = len(self.game.history)
+        self.deadline = time.perf_counter() + time_budget_ms / 1000
+        try:
+            for depth in range(1, len(legal_moves) + 1):
+                self.pv_lines = [[] for _ in range(depth + 1)]
+                move, value, pv = self.search_root(depth, legal_moves)
+                if move is None:
+                    break
+                best_move = move
+                self.pv_hint = pv
+                legal_moves.remove(move)
+                legal_moves.insert(0, move)
+                if abs(value) == math.inf:
+                    break
+        except SearchTimeout:
+            while len(self.game.history) > root_history:
+                self.game.unmake_move()
+        finally:
+            self.deadline = None
+            self.pv_lines = None
+            self.pv_hint = []
+        return best_move
+    
+    def search_root(self, depth, legal_moves):
+        best_move = None
+        best_value = -math.inf if self.game.current_player == self.player else math.inf
+        best_pv = []
+        
+        maximizing = self.game.current_player == self.player
         for move in legal_moves:
-            successor = self.game.successor_func(move)
-            if successor:
-                if self.game.current_player == self.player:
-                    value = self.minimax_alphabeta(successor, self.depth - 1, -math.inf, math.inf, False)
-                    if value > best_value:
-                        best_value = value
-                        best_move = move
-                else:
-                    value = self.minimax_alphabeta(successor, self.depth - 1, -math.inf, math.inf, True)
-                    if value < best_value:
-                        best_value = value
-                        best_move = move
+            self.game.make_move(move)
+            if maximizing:
+                value = self.minimax_alphabeta(self.game, depth - 1, -math.inf, math.inf, False)
+                self.game.unmake_move()
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                    if self.pv_lines is not None:
+                        best_pv = [move] + self.pv_lines[1]
+            else:
+                value = self.minimax_alphabeta(self.game, depth - 1, -math.inf, math.inf, True)
+                self.game.unmake_move()
+                if value < best_value:
+                    best_value = value
+                    best_move = move
+                    if self.pv_lines is not None:
+                        best_pv = [move] + self.pv_lines[1]
         
-        return best_move
+        return best_move, best_value, best_pv
     
-    def minimax_alphabeta(self, game_state, depth, alpha, beta, maximizing_player):
+    def minimax_alphabeta(self, game_state, depth, alpha, beta, maximizing_player, ply=1):
+        if self.pv_lines is not None:
+            self.pv_lines[ply] = []
+        
         if depth == 0 or game_state.is_game_over():
             return game_state.evaluate_func()
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
         
         legal_moves = game_state.get_valid_moves()
         if not legal_moves:
             return game_state.evaluate_func()
         
+        if ply < len(self.pv_hint) and self.pv_hint[ply] in legal_moves:
+            legal_moves.remove(self.pv_hint[ply])
+            legal_moves.insert(0, self.pv_hint[ply])
+        
         if maximizing_player:
             value = -math.inf
             for move in legal_moves:
-                successor = game_state.successor_func(move)
-                if successor:
-                    value = max(value, self.minimax_alphabeta(successor, depth - 1, alpha, beta, False))
-                    alpha = max(alpha, value)
-                    if alpha >= beta:
-                        break
+                game_state.make_move(move)
+                child = self.minimax_alphabeta(game_state, depth - 1, alpha, beta, False, ply + 1)
+                game_state.unmake_move()
+                if child > value:
+                    value = child
+                    if self.pv_lines is not None:
+                        self.pv_lines[ply] = [move] + self.pv_lines[ply + 1]
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
             return value
         else:
             value = math.inf
             for move in legal_moves:
-                successor = game_state.successor_func(move)
-                if successor:
-                    value = min(value, self.minimax_alphabeta(successor, depth - 1, alpha, beta, True))
-                    beta = min(beta, value)
-                    if alpha >= beta:
-                        break
+                game_state.make_move(move)
+                child = self.minimax_alphabeta(game_state, depth - 1, alpha, beta, True, ply + 1)
+                game_state.unmake_move()
+                if child < value:
+                    value = child
+                    if self.pv_lines is not None:
+                        self.pv_lines[ply] = [move] + self.pv_lines[ply + 1]
+                beta = min(beta, value)
+                if alpha >= beta:
+                    break
             return value
 
     def make_move(self):
@@ -66,4 +132,4 @@ class AIPlayer:
             x, y = best_move
             print(f"AI ({self.player}) plays at ({x}, {y})")
             return self.game.place_pin(x, y)
-        return False
\ No newline at end of file
+        return False
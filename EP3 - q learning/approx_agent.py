@@ -0,0 +1,190 @@
+import os
+import pickle
+import random
+import threading
+import numpy as np
+from game import BOARD_SIZE
+from batch_eval import UNREACHABLE, connects_top_bottom, connection_distance_map
+from qtable import NUM_ACTIONS, KEY_DTYPE, action_index
+
+# planos de entrada, todos BOARD_SIZE x BOARD_SIZE: peças de X, peças de O, casas vazias e
+# o custo de ligação (ver connection_distance_map) de cada casa até cada borda, para os
+# dois jogadores. as bordas em si são iguais em todo tabuleiro e ficam no bias
+NUM_PLANES = 7
+NUM_FEATURES = NUM_PLANES * NUM_ACTIONS
+KEY_POWERS = np.array([3 ** (NUM_ACTIONS - 1 - cell) for cell in range(NUM_ACTIONS)], dtype=KEY_DTYPE)
+
+
+def decode_states(states):
+    # chaves em base 3 -> tabuleiros K x BOARD_SIZE x BOARD_SIZE (0 vazio, 1 X, 2 O)
+    if KEY_DTYPE is object:
+        digits = [[int(state) // 3 ** (NUM_ACTIONS - 1 - cell) % 3 for cell in range(NUM_ACTIONS)] for state in states]
+        boards = np.array(digits, dtype=np.int8)
+    else:
+        boards = (np.asarray(states, dtype=np.int64)[:, None] // KEY_POWERS[None, :] % 3).astype(np.int8)
+    return boards.reshape(-1, BOARD_SIZE, BOARD_SIZE)
+
+
+def distance_planes(stones, blocked):
+    # custo da primeira linha até cada casa e da última linha até cada casa
+    scale = float(NUM_ACTIONS)
+    from_start = connection_distance_map(stones, blocked)
+    from_end = connection_distance_map(stones[:, ::-1], blocked[:, ::-1])[:, ::-1]
+    return [np.where(d >= UNREACHABLE, 1.0, d / scale) for d in (from_start, from_end)]
+
+
+def state_features(states):
+    boards = decode_states(states)
+    x_stones = boards == 1
+    o_stones = boards == 2
+    empty = boards == 0
+    # PLAYER_2 liga esquerda e direita: transposto vira o mesmo cálculo de cima para baixo
+    o_t = np.ascontiguousarray(o_stones.transpose(0, 2, 1))
+    x_t = np.ascontiguousarray(x_stones.transpose(0, 2, 1))
+    x_start, x_end = distance_planes(x_stones, o_stones)
+    o_start, o_end = distance_planes(o_t, x_t)
+    planes = [x_stones, o_stones, empty, x_start, x_end,
+              o_start.transpose(0, 2, 1), o_end.transpose(0, 2, 1)]
+    features = np.stack(planes, axis=1).astype(np.float32).reshape(len(boards), NUM_FEATURES)
+
+    valid = empty.reshape(len(boards), NUM_ACTIONS)
+    terminal = connects_top_bottom(x_stones) | connects_top_bottom(o_t) | ~valid.any(axis=1)
+    return features, valid, terminal
+
+
+# agente com a mesma interface de QLearningAgent, mas Q(s, ·) vem de um modelo sobre
+# os planos do tabuleiro: linear (hidden=0, uma multiplicação de matriz por jogada) ou
+# um MLP com uma camada escondida. a memória não cresce com os estados vistos
+class ApproxQAgent:
+    CHECKPOINT = 'twixt_approx_agent'
+
+    def __init__(self, alpha=0.001, gamma=0.9, epsilon=1.0, min_epsilon=0.01, decay=0.9995, hidden=0,
+                 max_td_error=50.0, seed=None):
+        self.alpha = alpha
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.min_epsilon = min_epsilon
+        self.decay = decay
+        self.hidden = hidden
+        # erro TD limitado, para as recompensas de ±100 não dispararem o gradiente
+        self.max_td_error = max_td_error
+        self.symmetry = False
+        self.training_data = []
+
+        rng = np.random.default_rng(seed)
+        if hidden:
+            self.params = {
+                'w1': (rng.standard_normal((NUM_FEATURES, hidden)) * np.sqrt(2 / NUM_FEATURES)).astype(np.float32),
+                'b1': np.zeros(hidden, dtype=np.float32),
+                'w2': (rng.standard_normal((hidden, NUM_ACTIONS)) * np.sqrt(1 / hidden)).astype(np.float32),
+                'b2': np.zeros(NUM_ACTIONS, dtype=np.float32),
+            }
+        else:
+            self.params = {
+                'w': (rng.standard_normal((NUM_FEATURES, NUM_ACTIONS)) * 0.01).astype(np.float32),
+                'b': np.zeros(NUM_ACTIONS, dtype=np.float32),
+            }
+
+    def get_state_representation(self, game):
+        return game.state_key
+
+    def get_valid_actions(self, game):
+        return game.get_valid_moves()
+
+    def forward(self, features):
+        p = self.params
+        if self.hidden:
+            hidden = np.maximum(features @ p['w1'] + p['b1'], 0.0)
+            return hidden @ p['w2'] + p['b2'], hidden
+        return features @ p['w'] + p['b'], None
+
+    def q_values(self, states):
+        features, valid, terminal = state_features(states)
+        q, _ = self.forward(features)
+        return np.where(valid, q, -np.inf), terminal
+
+    def get_q_value(self, state, action):
+        return float(self.q_values([state])[0][0, action_index(action)])
+
+    def update_q_values(self, states, actions, rewards, next_states):
+        # um passo de gradiente no lote: forward dos próximos estados para o alvo,
+        # forward e backward dos estados atuais só na ação jogada
+        next_q, next_terminal = self.q_values(next_states)
+        best_next = np.where(next_terminal, 0.0, next_q.max(axis=1))
+        td_target = np.asarray(rewards, dtype=np.float32) + self.gamma * best_next
+
+        features, _, _ = state_features(states)
+        q, hidden = self.forward(features)
+        rows = np.arange(len(features))
+        actions = np.asarray(actions)
+        td_error = np.clip(td_target - q[rows, actions], -self.max_td_error, self.max_td_error)
+
+        grad_q = np.zeros_like(q)
+        grad_q[rows, actions] = td_error / len(features)
+        p = self.params
+        if self.hidden:
+            grad_hidden = (grad_q @ p['w2'].T) * (hidden > 0)
+            p['w2'] += self.alpha * (hidden.T @ grad_q)
+            p['b2'] += self.alpha * grad_q.sum(axis=0)
+            p['w1'] += self.alpha * (features.T @ grad_hidden)
+            p['b1'] += self.alpha * grad_hidden.sum(axis=0)
+        else:
+            p['w'] += self.alpha * (features.T @ grad_q)
+            p['b'] += self.alpha * grad_q.sum(axis=0)
+
+    def update_q_value(self, state, action, reward, next_state):
+        self.update_q_values([state], [action_index(action)], [reward], [next_state])
+
+    def replay_update(self, buffer, batch_size=64):
+        # o fim do jogo já é reconhecido pelos próprios próximos estados
+        states, actions, rewards, next_states, _ = buffer.sample(batch_size)
+        self.update_q_values(states, actions, rewards, next_states)
+
+    def choose_actions(self, states, valid_masks, training_mode=True):
+        q, _ = self.q_values(states)
+        q = np.where(valid_masks, q, -np.inf)
+        if training_mode:
+            explore = np.random.rand(len(q)) < self.epsilon
+            q[explore] = np.where(valid_masks[explore], 0.0, -np.inf)
+        best = q == q.max(axis=1, keepdims=True)
+        return np.argmax(np.where(best & valid_masks, np.random.rand(*q.shape), -1.0), axis=1)
+
+    def choose_action(self, game, training_mode=True):
+        valid_actions = self.get_valid_actions(game)
+        if not valid_actions:
+            return None
+
+        # ε-greedy
+        if training_mode and np.random.rand() < self.epsilon:
+            return random.choice(valid_actions)  # exploração
+        q = self.q_values([self.get_state_representation(game)])[0][0]
+        q_values = q[[action_index(a) for a in valid_actions]]
+        best_actions = [a for a, value in zip(valid_actions, q_values) if value == q_values.max()]
+        return random.choice(best_actions)
+
+    def decay_epsilon(self):
+        self.epsilon = max(self.min_epsilon, self.epsilon * self.decay)
+
+    def save_data(self, filename, async_save=True):
+        if async_save:
+            threading.Thread(target=self._save_data, args=(filename,)).start()
+        else:
+            self._save_data(filename)
+
+    def _save_data(self, filename):
+        with open(filename, 'wb') as f:
+            pickle.dump({
+                'params': {name: value.copy() for name, value in self.params.items()},
+                'hidden': self.hidden,
+                'epsilon': self.epsilon,
+                'training_data': self.training_data
+            }, f)
+
+    def load_data(self, filename):
+        if os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                data = pickle.load(f)
+                self.params = data['params']
+                self.hidden = data['hidden']
+                self.epsilon = data['epsilon']
+                self.training_data = data.get('training_data', [])
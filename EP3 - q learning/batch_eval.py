@@ -0,0 +1,136 @@
+import numpy as np
+from game import BOARD_SIZE, PLAYER_1, PLAYER_2
+
+# posições em lote: array N x BOARD_SIZE x BOARD_SIZE de int8,
+# 0 = vazio, 1 = PLAYER_1, 2 = PLAYER_2 (os mesmos dígitos de get_state_str)
+CELL_CODES = {PLAYER_1: 1, PLAYER_2: 2}
+
+WIN_SCORE = 10000
+
+
+def weight_matrices():
+    center = BOARD_SIZE // 2
+    i, j = np.indices((BOARD_SIZE, BOARD_SIZE))
+    distance_to_center = np.abs(i - center) + np.abs(j - center)
+    distance_to_corner = np.minimum.reduce([i + j, i + (BOARD_SIZE-1 - j),
+                                            (BOARD_SIZE-1 - i) + j, (BOARD_SIZE-1 - i) + (BOARD_SIZE-1 - j)])
+    return BOARD_SIZE - distance_to_center, BOARD_SIZE - distance_to_corner
+
+
+CENTER_WEIGHTS, CORNER_WEIGHTS = weight_matrices()
+
+NEIGHBOUR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1),
+                     (0, -1),           (0, 1),
+                     (1, -1),  (1, 0),  (1, 1)]
+
+
+def board_to_array(game):
+    digits = np.frombuffer(game.get_state_str().encode(), dtype=np.uint8) - ord('0')
+    return digits.astype(np.int8).reshape(BOARD_SIZE, BOARD_SIZE)
+
+
+def neighbour_slices(mask):
+    # as 8 vizinhas de cada casa nas duas últimas dimensões, com zero fora do tabuleiro
+    pad = [(0, 0)] * (mask.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mask, pad)
+    return [padded[..., 1 + dx:1 + dx + BOARD_SIZE, 1 + dy:1 + dy + BOARD_SIZE]
+            for dx, dy in NEIGHBOUR_OFFSETS]
+
+
+def neighbour_count(mask):
+    return sum(s.astype(np.int32) for s in neighbour_slices(mask))
+
+
+def dilate(mask):
+    # separável: primeiro espalha na linha, depois na coluna
+    row = mask.copy()
+    row[..., :, 1:] |= mask[..., :, :-1]
+    row[..., :, :-1] |= mask[..., :, 1:]
+    grown = row.copy()
+    grown[..., 1:, :] |= row[..., :-1, :]
+    grown[..., :-1, :] |= row[..., 1:, :]
+    return grown
+
+
+def connects_top_bottom(stones):
+    # flood fill a partir da primeira linha, em lote
+    reached = np.zeros_like(stones)
+    reached[..., 0, :] = stones[..., 0, :]
+    while True:
+        grown = dilate(reached) & stones
+        if np.array_equal(grown, reached):
+            break
+        reached = grown
+    return reached[..., BOARD_SIZE - 1, :].any(axis=-1)
+
+
+def count_connection(stones):
+    return (stones * neighbour_count(stones)).sum(axis=(-2, -1)) // 2
+
+
+UNREACHABLE = 10 * BOARD_SIZE * BOARD_SIZE
+
+
+def min_neighbour(dist):
+    # mínimo 3x3 separável, com UNREACHABLE fora do tabuleiro
+    row = dist.copy()
+    np.minimum(row[..., :, 1:], dist[..., :, :-1], out=row[..., :, 1:])
+    np.minimum(row[..., :, :-1], dist[..., :, 1:], out=row[..., :, :-1])
+    grown = row.copy()
+    np.minimum(grown[..., 1:, :], row[..., :-1, :], out=grown[..., 1:, :])
+    np.minimum(grown[..., :-1, :], row[..., 1:, :], out=grown[..., :-1, :])
+    return grown
+
+
+def connection_distance_map(stones, blocked):
+    # mesmo custo de TwixtGame.connection_distance_map, ligando a linha 0 à última:
+    # relaxação em lote até estabilizar (casa vazia = 1, própria = 0, do oponente bloqueia)
+    cell_cost = np.where(stones, 0, 1).astype(np.int32)
+    dist = np.full(stones.shape, UNREACHABLE, dtype=np.int32)
+    dist[:, 0, :] = np.where(blocked[:, 0, :], UNREACHABLE, cell_cost[:, 0, :])
+    while True:
+        relaxed = np.minimum(dist, min_neighbour(dist) + cell_cost)
+        relaxed[blocked] = UNREACHABLE
+        if np.array_equal(relaxed, dist):
+            return dist
+        dist = relaxed
+
+
+def connection_score(stones, blocked):
+    cost = connection_distance_map(stones, blocked)[:, BOARD_SIZE - 1, :].min(axis=1)
+    return np.where(cost < UNREACHABLE, (BOARD_SIZE - cost) * 4, 0)
+
+
+def evaluate_player(stones, blocked):
+    return connection_score(stones, blocked) + count_connection(stones) * 2
+
+
+def evaluate_batch(boards):
+    boards = np.asarray(boards, dtype=np.int8)
+    x_stones = boards == CELL_CODES[PLAYER_1]
+    # PLAYER_2 liga esquerda e direita: transposto vira o mesmo problema de cima para baixo
+    o_stones = np.ascontiguousarray((boards == CELL_CODES[PLAYER_2]).transpose(0, 2, 1))
+    valid_moves = (boards == 0).sum(axis=(1, 2))
+
+    # posições terminais são reconhecidas pelo próprio tabuleiro
+    x_wins = connects_top_bottom(x_stones)
+    o_wins = connects_top_bottom(o_stones)
+    score = np.where(x_wins, float(WIN_SCORE), np.where(o_wins, float(-WIN_SCORE), 0.0))
+
+    playing = ~(x_wins | o_wins) & (valid_moves > 0)
+    x_stones, o_stones, valid_moves = x_stones[playing], o_stones[playing], valid_moves[playing]
+
+    player1_score = evaluate_player(x_stones, o_stones.transpose(0, 2, 1))
+    player2_score = evaluate_player(o_stones, x_stones.transpose(0, 2, 1))
+    strategic_position = ((x_stones * CENTER_WEIGHTS).sum(axis=(1, 2))
+                          - (o_stones.transpose(0, 2, 1) * CORNER_WEIGHTS).sum(axis=(1, 2)))
+
+    score[playing] = (player1_score - player2_score) + 0.1 * valid_moves + 0.2 * strategic_position
+    return score
+
+
+def children_boards(board, moves, player):
+    moves = np.asarray(moves)
+    children = np.repeat(board[None], len(moves), axis=0)
+    children[np.arange(len(moves)), moves[:, 0], moves[:, 1]] = CELL_CODES[player]
+    return children
@@ -0,0 +1,140 @@
+import argparse
+import json
+import platform
+import statistics
+import time
+from game import TwixtGame, BOARD_SIZE, PLAYER_1, PLAYER_2
+from bitboard import BitboardTwixtGame
+from minimax import MinimaxAIPlayer
+
+ENGINES = {'twixt': TwixtGame, 'bitboard': BitboardTwixtGame}
+
+# posições fixas (sequências de jogadas a partir do tabuleiro vazio), nenhuma terminada
+POSITIONS = {
+    'opening': [(1, 2), (0, 4), (3, 0), (1, 3)],
+    'middlegame': [(0, 3), (1, 0), (1, 1), (4, 2), (2, 1), (4, 4), (5, 1), (4, 1), (5, 5), (2, 0),
+                   (1, 5), (4, 3), (1, 3), (5, 0)],
+    'late': [(2, 3), (5, 5), (1, 2), (4, 1), (5, 3), (3, 4), (3, 2), (0, 2), (4, 0), (0, 0), (3, 1),
+             (1, 5), (4, 3), (1, 4), (1, 3), (4, 4), (5, 1), (5, 2), (4, 5), (3, 3), (1, 0), (0, 5),
+             (3, 5), (0, 4)],
+}
+
+
+def build_position(game_class, moves):
+    game = game_class()
+    for move in moves:
+        game.make_move(move)
+    return game
+
+
+def time_repeats(func, number, repeats):
+    # devolve a taxa (chamadas por segundo) de cada repetição
+    rates = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rates.append(number / (time.perf_counter() - start))
+    return rates
+
+
+def micro_benchmarks(game):
+    move = game.get_valid_moves()[0]
+    x, y = move
+    own = next((i, j) for i in range(BOARD_SIZE) for j in range(BOARD_SIZE)
+               if game.board[i][j] == PLAYER_1)
+
+    def place_pin():
+        # place_pin seguido de unmake_move, para a posição não mudar entre chamadas
+        game.place_pin(x, y)
+        game.unmake_move()
+
+    return {
+        'place_pin': place_pin,
+        'check_win': game.check_win,
+        'has_connection': lambda: game.has_connection(PLAYER_1) or game.has_connection(PLAYER_2),
+        'get_valid_moves': game.get_valid_moves,
+        'successor_func': lambda: game.successor_func(move),
+        'evaluate_func': game.evaluate_func,
+        'find_connection_distance': lambda: game.find_connection_distance(own[0], own[1], BOARD_SIZE - 1, own[1], PLAYER_1),
+    }
+
+
+def summary(rates, unit):
+    return {
+        'unit': unit,
+        'median': statistics.median(rates),
+        'stdev': statistics.stdev(rates) if len(rates) > 1 else 0.0,
+        'repeats': len(rates),
+    }
+
+
+def run_micro(game_class, number, repeats):
+    results = {}
+    for position, moves in POSITIONS.items():
+        game = build_position(game_class, moves)
+        for name, func in micro_benchmarks(game).items():
+            results[f"{name}/{position}"] = summary(time_repeats(func, number, repeats), 'ops/s')
+    return results
+
+
+def run_search(game_class, depths, repeats):
+    # cada repetição começa com um jogador novo, para a tabela de transposição estar vazia;
+    # sem livro de aberturas nem resolvedor de finais, que respondem sem buscar
+    results = {}
+    for position, moves in POSITIONS.items():
+        for depth in depths:
+            rates = []
+            for _ in range(repeats):
+                game = build_position(game_class, moves)
+                player = MinimaxAIPlayer(game, game.current_player, depth=depth, use_book=False, endgame_threshold=0)
+                start = time.perf_counter()
+                player.get_best_move()
+                rates.append(player.nodes / (time.perf_counter() - start))
+            result = summary(rates, 'nodes/s')
+            result['nodes'] = player.nodes
+            results[f"get_best_move/depth{depth}/{position}"] = result
+    return results
+
+
+def compare(results, baseline):
+    print(f"{'benchmark':45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:45} {'-':>12} {result['median']:12.0f} {'new':>8}")
+            continue
+        old = baseline[name]['median']
+        change = f"{result['median'] / old - 1:+8.1%}" if old else f"{'-':>8}"
+        print(f"{name:45} {old:12.0f} {result['median']:12.0f} {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="micro-benchmarks for the twixt engine and minimax search")
+    parser.add_argument('--engine', choices=ENGINES, default='twixt')
+    parser.add_argument('--number', type=int, default=1000, help="calls per repeat in the micro-benchmarks")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--depths', type=int, nargs='+', default=[2, 3, 4])
+    parser.add_argument('--skip-search', action='store_true')
+    parser.add_argument('--save', metavar='FILE', help="write the results as a json baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a saved json baseline")
+    args = parser.parse_args()
+
+    game_class = ENGINES[args.engine]
+    results = run_micro(game_class, args.number, args.repeats)
+    if not args.skip_search:
+        results.update(run_search(game_class, args.depths, args.repeats))
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)['results'])
+    else:
+        for name, result in results.items():
+            print(f"{name:45} {result['median']:12.0f} {result['unit']:8} ±{result['stdev']:.0f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'engine': args.engine, 'python': platform.python_version(), 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+from game import TwixtGame, BOARD_SIZE, PLAYER_1, PLAYER_2, EMPTY, ZOBRIST, ZOBRIST_SIDE, STRATEGIC_WEIGHTS, STATE_KEY_WEIGHTS
+
+# cada jogador guarda suas peças num inteiro: bit (x * BOARD_SIZE + y) = casa (x, y)
+NUM_CELLS = BOARD_SIZE * BOARD_SIZE
+FULL_MASK = (1 << NUM_CELLS) - 1
+
+ROW_MASK = (1 << BOARD_SIZE) - 1
+TOP_ROW = ROW_MASK
+BOTTOM_ROW = ROW_MASK << (BOARD_SIZE * (BOARD_SIZE - 1))
+LEFT_COL = sum(1 << (x * BOARD_SIZE) for x in range(BOARD_SIZE))
+RIGHT_COL = LEFT_COL << (BOARD_SIZE - 1)
+NOT_LEFT_COL = FULL_MASK & ~LEFT_COL
+NOT_RIGHT_COL = FULL_MASK & ~RIGHT_COL
+# borda de partida e de chegada de cada jogador
+EDGES = {PLAYER_1: (TOP_ROW, BOTTOM_ROW), PLAYER_2: (LEFT_COL, RIGHT_COL)}
+
+MOVES = [(i // BOARD_SIZE, i % BOARD_SIZE) for i in range(NUM_CELLS)]
+
+# get_valid_moves lê a máscara de casas vazias em pedaços de CHUNK_BITS bits: para cada
+# pedaço e cada valor possível, a lista de jogadas já pronta
+CHUNK_BITS = 12
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+CHUNK_MOVES = [[[MOVES[start + bit] for bit in range(CHUNK_BITS) if pattern >> bit & 1 and start + bit < NUM_CELLS]
+                for pattern in range(1 << CHUNK_BITS)]
+               for start in range(0, NUM_CELLS, CHUNK_BITS)]
+
+
+def expand(mask):
+    # a própria máscara mais as 8 casas vizinhas de cada bit, sem dar a volta nas bordas
+    row = mask | ((mask & NOT_RIGHT_COL) << 1) | ((mask & NOT_LEFT_COL) >> 1)
+    return (row | (row << BOARD_SIZE) | (row >> BOARD_SIZE)) & FULL_MASK
+
+
+def flood_fill(seed, stones):
+    # expand escrito aqui dentro: é o laço mais quente do motor
+    reached = seed & stones
+    while True:
+        row = reached | ((reached & NOT_RIGHT_COL) << 1) | ((reached & NOT_LEFT_COL) >> 1)
+        grown = (row | (row << BOARD_SIZE) | (row >> BOARD_SIZE)) & stones
+        if grown == reached:
+            return reached
+        reached = grown
+
+
+def strategic_weight_masks():
+    center = BOARD_SIZE // 2
+    center_weights = {}
+    corner_weights = {}
+    for i in range(BOARD_SIZE):
+        for j in range(BOARD_SIZE):
+            bit = 1 << (i * BOARD_SIZE + j)
+            distance_to_center = abs(i - center) + abs(j - center)
+            distance_to_corner = min(i + j, i + (BOARD_SIZE-1 - j),
+                                     (BOARD_SIZE-1 - i) + j, (BOARD_SIZE-1 - i) + (BOARD_SIZE-1 - j))
+            w1 = BOARD_SIZE - distance_to_center
+            w2 = BOARD_SIZE - distance_to_corner
+            center_weights[w1] = center_weights.get(w1, 0) | bit
+            corner_weights[w2] = corner_weights.get(w2, 0) | bit
+    return list(center_weights.items()), list(corner_weights.items())
+
+
+CENTER_WEIGHT_MASKS, CORNER_WEIGHT_MASKS = strategic_weight_masks()
+
+NEIGHBOUR_MASKS = [expand(1 << i) & ~(1 << i) for i in range(NUM_CELLS)]
+
+
+def count_adjacent_pairs(stones):
+    # cada par vizinho é contado uma vez: leste, sul, sudeste e sudoeste
+    east = ((stones & NOT_RIGHT_COL) << 1) & stones
+    south = (stones << BOARD_SIZE) & stones
+    south_east = ((stones & NOT_RIGHT_COL) << (BOARD_SIZE + 1)) & stones
+    south_west = ((stones & NOT_LEFT_COL) << (BOARD_SIZE - 1)) & stones
+    return east.bit_count() + south.bit_count() + south_east.bit_count() + south_west.bit_count()
+
+
+def strategic_total(x_mask, o_mask):
+    score = 0
+    for weight, mask in CENTER_WEIGHT_MASKS:
+        score += weight * (x_mask & mask).bit_count()
+    for weight, mask in CORNER_WEIGHT_MASKS:
+        score -= weight * (o_mask & mask).bit_count()
+    return score
+
+
+class BitboardTwixtGame(TwixtGame):
+    def __init__(self):
+        self.stones = {PLAYER_1: 0, PLAYER_2: 0}
+        # peças de cada jogador ligadas à sua borda de partida, atualizadas a cada jogada:
+        # há vitória quando elas chegam na outra borda
+        self.reach = {PLAYER_1: 0, PLAYER_2: 0}
+        self.current_player = PLAYER_1
+        self.game_over = False
+        self.winner = None
+        self.history = []
+        self.hash = 0
+        self.adjacent_pairs = {PLAYER_1: 0, PLAYER_2: 0}
+        self.strategic_score = 0
+        self.state_key = 0
+        self.observers = []
+        self._board_stones = None
+        self._board = None
+
+    @property
+    def board(self):
+        # a lista montada é reaproveitada enquanto as peças não mudam (só para leitura)
+        x_mask = self.stones[PLAYER_1]
+        o_mask = self.stones[PLAYER_2]
+        if self._board_stones == (x_mask, o_mask):
+            return self._board
+        board = []
+        for i in range(BOARD_SIZE):
+            row = []
+            for j in range(BOARD_SIZE):
+                bit = 1 << (i * BOARD_SIZE + j)
+                if x_mask & bit:
+                    row.append(PLAYER_1)
+                elif o_mask & bit:
+                    row.append(PLAYER_2)
+                else:
+                    row.append(EMPTY)
+            board.append(row)
+        self._board_stones = (x_mask, o_mask)
+        self._board = board
+        return board
+
+    @board.setter
+    def board(self, board):
+        self.stones = {PLAYER_1: 0, PLAYER_2: 0}
+        self.hash = 0 if self.current_player == PLAYER_1 else ZOBRIST_SIDE
+        self.state_key = 0
+        for i in range(BOARD_SIZE):
+            for j in range(BOARD_SIZE):
+                if board[i][j] != EMPTY:
+                    self.stones[board[i][j]] |= 1 << (i * BOARD_SIZE + j)
+                    self.hash ^= ZOBRIST[board[i][j]][i * BOARD_SIZE + j]
+                    self.state_key += STATE_KEY_WEIGHTS[board[i][j]][i * BOARD_SIZE + j]
+        self.adjacent_pairs = {p: count_adjacent_pairs(stones) for p, stones in self.stones.items()}
+        self.reach = {p: flood_fill(EDGES[p][0], stones) for p, stones in self.stones.items()}
+        self.strategic_score = strategic_total(self.stones[PLAYER_1], self.stones[PLAYER_2])
+
+    def empty_mask(self):
+        return FULL_MASK & ~(self.stones[PLAYER_1] | self.stones[PLAYER_2])
+
+    def is_valid_move(self, x, y):
+        return (0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE
+                and not (self.stones[PLAYER_1] | self.stones[PLAYER_2]) >> (x * BOARD_SIZE + y) & 1)
+
+    def make_move(self, move):
+        x, y = move
+        player = self.current_player
+        cell = x * BOARD_SIZE + y
+        bit = 1 << cell
+        self.history.append((bit, player, self.game_over, self.winner, self.hash, self.reach[player]))
+        self.stones[player] |= bit
+        # o flood fill só roda quando a peça nova encosta no que já estava ligado, e só
+        # pelas peças ainda não ligadas (reach já é fechado): em geral uma ou duas expansões
+        reach = self.reach[player]
+        if bit & EDGES[player][0] or NEIGHBOUR_MASKS[cell] & reach:
+            self.reach[player] = reach | flood_fill(bit, self.stones[player] & ~reach)
+        self.hash ^= ZOBRIST[player][cell]
+        self.strategic_score += STRATEGIC_WEIGHTS[player][cell]
+        self.state_key += STATE_KEY_WEIGHTS[player][cell]
+        self.adjacent_pairs[player] += (NEIGHBOUR_MASKS[cell] & self.stones[player]).bit_count()
+
+        if self.has_connection(player):
+            self.game_over = True
+            self.winner = player
+        elif not self.empty_mask():
+            self.game_over = True
+        else:
+            self.current_player = PLAYER_2 if player == PLAYER_1 else PLAYER_1
+            self.hash ^= ZOBRIST_SIDE
+
+    def unmake_move(self):
+        bit, player, self.game_over, self.winner, self.hash, self.reach[player] = self.history.pop()
+        self.current_player = player
+        self.stones[player] ^= bit
+        cell = bit.bit_length() - 1
+        self.strategic_score -= STRATEGIC_WEIGHTS[player][cell]
+        self.state_key -= STATE_KEY_WEIGHTS[player][cell]
+        self.adjacent_pairs[player] -= (NEIGHBOUR_MASKS[cell] & self.stones[player]).bit_count()
+
+    def played_moves(self):
+        return [MOVES[bit.bit_length() - 1] for bit, *_ in self.history]
+
+    def check_win(self):
+        return self.has_connection(self.current_player)
+
+    def has_connection(self, player):
+        return bool(self.reach[player] & EDGES[player][1])
+
+    def get_valid_moves(self):
+        moves = []
+        empty = self.empty_mask()
+        for chunk_moves in CHUNK_MOVES:
+            moves += chunk_moves[empty & CHUNK_MASK]
+            empty >>= CHUNK_BITS
+        return moves
+
+    def find_connection_distance(self, x1, y1, x2, y2, player):
+        # BFS por camadas de bits: só anda por peças do jogador, e o destino é sempre aceito
+        target = 1 << (x2 * BOARD_SIZE + y2)
+        allowed = self.stones[player] | target
+        reached = frontier = 1 << (x1 * BOARD_SIZE + y1)
+        dist = 0
+        while frontier:
+            if frontier & target:
+                return dist
+            frontier = expand(frontier) & allowed & ~reached
+            reached |= frontier
+            dist += 1
+        return -1
+
+    def successor_func(self, move):
+        x, y = move
+        if not self.is_valid_move(x, y):
+            return None
+
+        new_game = BitboardTwixtGame()
+        new_game.stones = dict(self.stones)
+        new_game.reach = dict(self.reach)
+        new_game.current_player = self.current_player
+        new_game.history = self.history[:]
+        new_game.hash = self.hash
+        new_game.adjacent_pairs = dict(self.adjacent_pairs)
+        new_game.strategic_score = self.strategic_score
+        new_game.state_key = self.state_key
+        new_game.make_move(move)
+
+        return new_game
+
+    def evaluate_func(self):
+        if self.game_over:
+            if self.winner == PLAYER_1:
+                return 10000
+            elif self.winner == PLAYER_2:
+                return -10000
+            else:
+                return 0
+
+        player1_score = self.evaluate_player(PLAYER_1)
+        player2_score = self.evaluate_player(PLAYER_2)
+        valid_moves = self.empty_mask().bit_count()
+        strategic_position = self.evaluate_strategic_positions()
+
+        return (player1_score - player2_score) + 0.1 * valid_moves + 0.2 * strategic_position
+
+    def evaluate_player(self, player):
+        score = 0
+        cost = self.connection_cost(player)
+        if cost is not None:
+            score += (BOARD_SIZE - cost) * 4
+
+        connected = self.count_connection(player)
+        score += connected * 2
+
+        return score
+
+    def connection_cost(self, player):
+        # conjuntos de nível: reached = casas alcançáveis gastando no máximo cost casas vazias
+        own = self.stones[player]
+        empty = self.empty_mask()
+        if player == PLAYER_1:
+            start, end = TOP_ROW, BOTTOM_ROW
+        else:
+            start, end = LEFT_COL, RIGHT_COL
+
+        reached = flood_fill(start, own)
+        cost = 0
+        while not reached & end:
+            grown = reached | ((expand(reached) | start) & empty)
+            if grown == reached:
+                return None
+            reached = grown | flood_fill(expand(grown), own)
+            cost += 1
+        return cost
+
+    def connection_distances(self, player, stop_at_goal=False):
+        # os mesmos conjuntos de nível de connection_cost: a distância de uma casa é o
+        # nível em que ela entra em reached (peças do oponente ficam None)
+        if stop_at_goal:
+            return self.connection_cost(player)
+        own = self.stones[player]
+        empty = self.empty_mask()
+        start = TOP_ROW if player == PLAYER_1 else LEFT_COL
+
+        dist = [None] * NUM_CELLS
+        reached = flood_fill(start, own)
+        cost = 0
+        new = reached
+        while True:
+            while new:
+                low = new & -new
+                dist[low.bit_length() - 1] = cost
+                new ^= low
+            grown = reached | ((expand(reached) | start) & empty)
+            if grown == reached:
+                return dist
+            grown |= flood_fill(expand(grown), own)
+            new = grown & ~reached
+            reached = grown
+            cost += 1
+
+    def connection_distance_map(self, player):
+        dist = self.connection_distances(player)
+        return [dist[i * BOARD_SIZE:(i + 1) * BOARD_SIZE] for i in range(BOARD_SIZE)]
+
+    def count_connection(self, player):
+        return self.adjacent_pairs[player]
+
+    def evaluate_strategic_positions(self):
+        return self.strategic_score
+
+    def get_state_str(self):
+        x_mask = self.stones[PLAYER_1]
+        o_mask = self.stones[PLAYER_2]
+        state = []
+        for i in range(NUM_CELLS):
+            if x_mask >> i & 1:
+                state.append('1')
+            elif o_mask >> i & 1:
+                state.append('2')
+            else:
+                state.append('0')
+        return "".join(state)
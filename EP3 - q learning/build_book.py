@@ -0,0 +1,68 @@
+import argparse
+import multiprocessing
+import os
+import time
+from bitboard import BitboardTwixtGame
+from minimax import MinimaxAIPlayer
+from opening_book import OpeningBook, BOOK_FILE
+from qtable import action_index
+
+
+def book_positions(plies):
+    # todas as posições com menos de plies peças, como a sequência de jogadas que leva
+    # até ela. sem redução por simetria: evaluate_func não é simétrico (o centro fica em
+    # BOARD_SIZE // 2), então cada posição é buscada por ela mesma
+    positions = {}
+    frontier = [[]]
+    for _ in range(plies):
+        next_frontier = []
+        for moves in frontier:
+            game = BitboardTwixtGame()
+            for move in moves:
+                game.make_move(move)
+            if game.game_over:
+                continue
+            key = game.state_key
+            if key in positions:
+                continue
+            positions[key] = moves
+            next_frontier.extend(moves + [move] for move in game.get_valid_moves())
+        frontier = next_frontier
+    return list(positions.values())
+
+
+def search_position(task):
+    moves, depth = task
+    game = BitboardTwixtGame()
+    for move in moves:
+        game.make_move(move)
+    player = MinimaxAIPlayer(game, game.current_player, depth=depth, use_book=False)
+    best_move = player.get_best_move()
+    return game.state_key, action_index(best_move)
+
+
+def build_book(plies=3, depth=4, workers=None, filename=BOOK_FILE):
+    positions = book_positions(plies)
+    tasks = [(moves, depth) for moves in positions]
+    print(f"searching {len(tasks)} positions at depth {depth}")
+
+    start = time.time()
+    with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+        results = pool.map(search_position, tasks, chunksize=1)
+    print(f"done in {time.time() - start:.1f} seconds")
+
+    keys = [key for key, _ in results]
+    moves = [move for _, move in results]
+    book = OpeningBook(keys, moves, plies, depth)
+    book.save(filename)
+    return book
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="build the opening book used by the minimax and q-learning players")
+    parser.add_argument('--plies', type=int, default=3, help="book covers positions with fewer stones than this")
+    parser.add_argument('--depth', type=int, default=4, help="minimax depth used for each book position")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=BOOK_FILE)
+    args = parser.parse_args()
+    build_book(args.plies, args.depth, args.workers, args.output)
@@ -0,0 +1,74 @@
+import time
+from game import NEIGHBOURS, BOARD_SIZE, EMPTY
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+
+class SolverTimeout(Exception):
+    pass
+
+
+# resolve posições com poucas casas vazias até o fim do jogo: negamax só com vitória,
+# empate e derrota (do ponto de vista de quem joga), parando na primeira jogada que
+# ganha. todo resultado é exato, então fica guardado pelo hash de zobrist da posição
+class EndgameSolver:
+    def __init__(self):
+        self.cache = {}
+        self.nodes = 0
+        self.deadline = None
+
+    def ordered_moves(self, game):
+        # primeiro as casas com mais peças vizinhas: é perto delas que as ligações se decidem
+        board = game.board
+        moves = game.get_valid_moves()
+        moves.sort(key=lambda m: -sum(1 for n in NEIGHBOURS[m[0] * BOARD_SIZE + m[1]]
+                                      if board[n // BOARD_SIZE][n % BOARD_SIZE] != EMPTY))
+        return moves
+
+    def solve(self, game, deadline=None):
+        # devolve (resultado para quem joga, jogada que o garante), ou (None, None) se
+        # o prazo (em time.perf_counter) acabar antes. o que já foi resolvido fica no cache
+        self.deadline = deadline
+        root_history = len(game.history)
+        try:
+            return self.search(game)
+        except SolverTimeout:
+            while len(game.history) > root_history:
+                game.unmake_move()
+            return None, None
+        finally:
+            self.deadline = None
+
+    def search(self, game):
+        if game.game_over:
+            return (DRAW if game.winner is None else LOSS), None
+        cached = self.cache.get(game.hash)
+        if cached is not None:
+            return cached
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SolverTimeout()
+
+        moves = game.get_valid_moves()
+        for move in moves:
+            game.make_move(move)
+            won = game.winner is not None
+            game.unmake_move()
+            if won:
+                self.cache[game.hash] = (WIN, move)
+                return WIN, move
+
+        best_value, best_move = LOSS - 1, None
+        for move in self.ordered_moves(game):
+            game.make_move(move)
+            value = -self.search(game)[0]
+            game.unmake_move()
+            if value > best_value:
+                best_value, best_move = value, move
+                if value == WIN:
+                    break
+
+        self.cache[game.hash] = (best_value, best_move)
+        return best_value, best_move
@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import random
+import time
+import numpy as np
+from game import TwixtGame, PLAYER_1, PLAYER_2
+from minimax import MinimaxAIPlayer
+from qlearning import QLearningAIPlayer
+
+# o agente vai uma vez para cada processo do pool, no initializer
+_agent = None
+_game_class = None
+
+
+def _init_worker(agent, game_class):
+    global _agent, _game_class
+    _agent = agent
+    _game_class = game_class
+
+
+# uma partida do agente contra 'random' ou 'minimax'. a semente é fixada no começo
+# de cada partida, então o resultado não depende de qual processo a jogou
+def play_match(agent, match, game_class=TwixtGame):
+    index, seed, opponent, depth, agent_player = match
+    random.seed(seed)
+    np.random.seed(seed)
+
+    start = time.perf_counter()
+    game = game_class()
+    q_player = QLearningAIPlayer(agent)
+    other = PLAYER_2 if agent_player == PLAYER_1 else PLAYER_1
+    minimax = MinimaxAIPlayer(game, other, depth) if opponent == 'minimax' else None
+    moves = 0
+
+    while not game.is_game_over():
+        if game.current_player == agent_player:
+            q_player.make_move(game)
+        elif minimax:
+            minimax.make_move()
+        else:
+            valid_moves = game.get_valid_moves()
+            if valid_moves:
+                game.place_pin(*random.choice(valid_moves))
+        moves += 1
+
+    return {
+        'game': index,
+        'seed': seed,
+        'opponent': opponent,
+        'agent_player': agent_player,
+        'winner': game.winner,
+        'moves': moves,
+        'score': game.evaluate_func(),
+        'seconds': time.perf_counter() - start
+    }
+
+
+def _play_match(match):
+    return play_match(_agent, match, _game_class)
+
+
+def make_matches(num_games, opponent='random', depth=3, agent_player=PLAYER_1, seed=0, first_index=0):
+    return [(first_index + i, seed + first_index + i, opponent, depth, agent_player) for i in range(num_games)]
+
+
+def run_matches(agent, matches, workers=None, game_class=TwixtGame):
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(matches) <= 1:
+        results = [play_match(agent, match, game_class) for match in matches]
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(agent, game_class)) as pool:
+            results = pool.map(_play_match, matches, chunksize=max(1, len(matches) // (4 * workers)))
+    return sorted(results, key=lambda result: result['game'])
+
+
+def summarize(results):
+    games = len(results)
+    if games == 0:
+        return {'games': 0, 'wins': 0, 'losses': 0, 'draws': 0, 'win_rate': 0, 'loss_rate': 0,
+                'draw_rate': 0, 'avg_score': 0, 'avg_moves': 0, 'avg_seconds': 0, 'results': []}
+
+    wins = sum(1 for r in results if r['winner'] == r['agent_player'])
+    draws = sum(1 for r in results if r['winner'] is None)
+    losses = games - wins - draws
+    return {
+        'games': games,
+        'wins': wins,
+        'losses': losses,
+        'draws': draws,
+        'win_rate': wins / games,
+        'loss_rate': losses / games,
+        'draw_rate': draws / games,
+        'avg_score': sum(r['score'] for r in results) / games,
+        'avg_moves': sum(r['moves'] for r in results) / games,
+        'avg_seconds': sum(r['seconds'] for r in results) / games,
+        'results': results
+    }
+
+
+# mesmas partidas e métricas de QLearningAIPlayer.evaluate_agent, evaluate_against_minimax
+# e compare_vs_minimax, com o resumo completo junto
+def evaluate_agent(agent, num_games=100, workers=None, seed=0):
+    return summarize(run_matches(agent, make_matches(num_games, 'random', seed=seed), workers))
+
+
+def evaluate_against_minimax(agent, minimax_depth, games=50, workers=None, seed=0, game_class=TwixtGame):
+    matches = make_matches(games, 'minimax', minimax_depth, seed=seed)
+    return summarize(run_matches(agent, matches, workers, game_class))
+
+
+def compare_vs_minimax(agent, depth=3, num_games=50, workers=None, seed=0):
+    matches = (make_matches(num_games, 'minimax', depth, PLAYER_1, seed)
+               + make_matches(num_games, 'minimax', depth, PLAYER_2, seed, first_index=num_games))
+    summary = summarize(run_matches(agent, matches, workers))
+    summary['q_win_rate'] = summary['win_rate']
+    summary['minimax_win_rate'] = summary['loss_rate']
+    return summary
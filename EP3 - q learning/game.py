@@ -1,7 +1,8 @@
 from colorama import Fore, Style, init
 from collections import deque
+from connectivity import ConnectivityTracker, build_tables
 import math
-import copy
+import random
 
 init()
 
@@ -14,12 +15,55 @@ DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
               (0, -1),           (0, 1),
               (1, -1),  (1, 0),  (1, 1)]
 
+# chaves de zobrist: uma por (jogador, casa) e uma para a vez de jogar, semente fixa
+_zobrist_rng = random.Random(2024)
+ZOBRIST = {player: [_zobrist_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+           for player in (PLAYER_1, PLAYER_2)}
+ZOBRIST_SIDE = _zobrist_rng.getrandbits(64)
+
+NEIGHBOURS = build_tables(BOARD_SIZE)[0]
+
+def strategic_weight(player, i, j):
+    # PLAYER_1 ganha por estar perto do centro, PLAYER_2 perde menos perto dos cantos
+    if player == PLAYER_1:
+        center = BOARD_SIZE // 2
+        distance_to_center = abs(i - center) + abs(j - center)
+        return BOARD_SIZE - distance_to_center
+    distance_to_corner = min(i + j, i + (BOARD_SIZE-1 - j),
+                             (BOARD_SIZE-1 - i) + j, (BOARD_SIZE-1 - i) + (BOARD_SIZE-1 - j))
+    return -(BOARD_SIZE - distance_to_corner)
+
+# chave inteira do estado: get_state_str lido em base 3 (primeira casa é o dígito mais alto)
+CELL_DIGITS = {PLAYER_1: 1, PLAYER_2: 2}
+STATE_KEY_WEIGHTS = {player: [digit * 3 ** (BOARD_SIZE * BOARD_SIZE - 1 - cell) for cell in range(BOARD_SIZE * BOARD_SIZE)]
+                     for player, digit in CELL_DIGITS.items()}
+
+START_CELLS = {PLAYER_1: [y for y in range(BOARD_SIZE)],
+               PLAYER_2: [x * BOARD_SIZE for x in range(BOARD_SIZE)]}
+GOAL_CELLS = {PLAYER_1: frozenset((BOARD_SIZE - 1) * BOARD_SIZE + y for y in range(BOARD_SIZE)),
+              PLAYER_2: frozenset(x * BOARD_SIZE + BOARD_SIZE - 1 for x in range(BOARD_SIZE))}
+
+STRATEGIC_WEIGHTS = {player: [strategic_weight(player, i, j) for i in range(BOARD_SIZE) for j in range(BOARD_SIZE)]
+                     for player in (PLAYER_1, PLAYER_2)}
+
 class TwixtGame:
     def __init__(self):
         self.board = [[EMPTY for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
         self.current_player = PLAYER_1
         self.game_over = False
         self.winner = None
+        self.connections = ConnectivityTracker(BOARD_SIZE, PLAYER_1, PLAYER_2)
+        self.empty_cells = BOARD_SIZE * BOARD_SIZE
+        self.history = []
+        self.hash = 0
+        # totais das heurísticas 1 e 3, atualizados a cada jogada
+        self.adjacent_pairs = {PLAYER_1: 0, PLAYER_2: 0}
+        self.strategic_score = 0
+        self.state_key = 0
+        self.observers = []
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
 
     def print_board(self):
         print("  " + " ".join(Fore.RED + str(i) + Style.RESET_ALL for i in range(BOARD_SIZE)))
@@ -51,23 +95,62 @@ class TwixtGame:
         if not self.is_valid_move(x, y):
             return False
             
-        self.board[x][y] = self.current_player
-        self.print_board()
+        player = self.current_player
+        self.make_move((x, y))
+        for observer in self.observers:
+            observer.on_move(self, player, (x, y))
         
-        if self.check_win():
-            self.print_board()
-            self.game_over = True
-            self.winner = self.current_player
-        else:
-            if not self.get_valid_moves():
-                self.game_over = True
-            else:
-                self.switch_player()
+        if self.game_over:
+            for observer in self.observers:
+                observer.on_game_over(self, self.winner)
                 
         return True
 
+    # joga sem validar nem imprimir; unmake_move desfaz a última jogada (usado pela busca)
+    def make_move(self, move):
+        x, y = move
+        player = self.current_player
+        self.history.append((x, y, player, self.game_over, self.winner, self.hash))
+        self.board[x][y] = player
+        self.connections.add(player, x, y)
+        self.empty_cells -= 1
+        cell = x * BOARD_SIZE + y
+        self.hash ^= ZOBRIST[player][cell]
+        self.strategic_score += STRATEGIC_WEIGHTS[player][cell]
+        self.state_key += STATE_KEY_WEIGHTS[player][cell]
+        owner = self.connections.owner
+        for other in NEIGHBOURS[cell]:
+            if owner[other] == player:
+                self.adjacent_pairs[player] += 1
+
+        if self.connections.connected(player):
+            self.game_over = True
+            self.winner = player
+        elif self.empty_cells == 0:
+            self.game_over = True
+        else:
+            self.current_player = PLAYER_2 if player == PLAYER_1 else PLAYER_1
+            self.hash ^= ZOBRIST_SIDE
+
+    def unmake_move(self):
+        x, y, player, self.game_over, self.winner, self.hash = self.history.pop()
+        self.current_player = player
+        self.board[x][y] = EMPTY
+        self.connections.undo()
+        self.empty_cells += 1
+        cell = x * BOARD_SIZE + y
+        self.strategic_score -= STRATEGIC_WEIGHTS[player][cell]
+        self.state_key -= STATE_KEY_WEIGHTS[player][cell]
+        owner = self.connections.owner
+        for other in NEIGHBOURS[cell]:
+            if owner[other] == player:
+                self.adjacent_pairs[player] -= 1
+
+    def played_moves(self):
+        return [(x, y) for x, y, *_ in self.history]
+
     def check_win(self):
-        return self.has_connection(self.current_player)
+        return self.connections.connected(self.current_player)
 
     def has_connection(self, player):
         visited = [[False] * BOARD_SIZE for _ in range(BOARD_SIZE)]
@@ -106,25 +189,22 @@ class TwixtGame:
                     moves.append((i, j))
         return moves
     
-    def switch_player(self):
-        self.current_player = PLAYER_2 if self.current_player == PLAYER_1 else PLAYER_1
-    
     def successor_func(self, move):
         x, y = move
         if not self.is_valid_move(x, y):
             return None
             
         new_game = TwixtGame()
-        new_game.board = copy.deepcopy(self.board)
-        new_game.current_player = PLAYER_2 if self.current_player == PLAYER_1 else PLAYER_1
-        new_game.game_over = False
-        new_game.winner = None
-        
-        if new_game.check_win():
-            new_game.game_over = True
-            new_game.winner = self.current_player
-        else:
-            new_game.current_player = PLAYER_2 if self.current_player == PLAYER_1 else PLAYER_1
+        new_game.board = [row[:] for row in self.board]
+        new_game.connections = self.connections.copy()
+        new_game.current_player = self.current_player
+        new_game.empty_cells = self.empty_cells
+        new_game.history = self.history[:]
+        new_game.hash = self.hash
+        new_game.adjacent_pairs = dict(self.adjacent_pairs)
+        new_game.strategic_score = self.strategic_score
+        new_game.state_key = self.state_key
+        new_game.make_move(move)
         
         return new_game
     
@@ -144,8 +224,8 @@ class TwixtGame:
         player1_score = self.evaluate_player(PLAYER_1)
         player2_score = self.evaluate_player(PLAYER_2)
         
-        # heurística 2: número de movimentos possíveis
-        valid_moves = len(self.get_valid_moves())
+        # heurística 2: número de movimentos possíveis (as casas vazias, já contadas)
+        valid_moves = self.empty_cells
         
         # heurística 3: posições estratégicas (cantos e centro)
         strategic_position = self.evaluate_strategic_positions()
@@ -156,35 +236,72 @@ class TwixtGame:
     
     def evaluate_player(self, player):
         score = 0
-        if player == PLAYER_1:
-            for y in range(BOARD_SIZE):
-                if self.board[0][y] == PLAYER_1:
-                    for y2 in range(BOARD_SIZE):
-                        if self.board[BOARD_SIZE-1][y2] == PLAYER_1:
-                            distance = self.find_connection_distance(0, y, BOARD_SIZE-1, y2, player)
-                            if distance != -1:
-                                score += (BOARD_SIZE - distance) * 2
-        else:
-            for x in range(BOARD_SIZE):
-                if self.board[x][0] == PLAYER_2:
-                    for x2 in range(BOARD_SIZE):
-                        if self.board[x2][BOARD_SIZE-1] == PLAYER_2:
-                            distance = self.find_connection_distance(x, 0, x2, BOARD_SIZE-1, player)
-                            if distance != -1:
-                                score += (BOARD_SIZE - distance) * 2
+        # quanto menos casas vazias faltam para ligar as bordas, melhor
+        cost = self.connection_cost(player)
+        if cost is not None:
+            score += (BOARD_SIZE - cost) * 4
         
         connected = self.count_connection(player)
         score += connected * 2
         
         return score
+
+    def connection_distances(self, player, stop_at_goal=False):
+        # 0-1 BFS com todas as casas da borda de partida como origem: casa vazia custa 1,
+        # peça própria custa 0 e peça do oponente bloqueia (fica None)
+        owner = self.connections.owner
+        dist = [None] * (BOARD_SIZE * BOARD_SIZE)
+        queue = deque()
+        goal = GOAL_CELLS[player]
+        
+        for cell in START_CELLS[player]:
+            if owner[cell] == player:
+                dist[cell] = 0
+                queue.appendleft(cell)
+            elif owner[cell] is None:
+                dist[cell] = 1
+                queue.append(cell)
+        
+        while queue:
+            cell = queue.popleft()
+            d = dist[cell]
+            # a fila sai em ordem de custo: a primeira casa da borda final já é o mínimo
+            if stop_at_goal and cell in goal:
+                return d
+            for other in NEIGHBOURS[cell]:
+                o = owner[other]
+                if o is None:
+                    nd = d + 1
+                elif o == player:
+                    nd = d
+                else:
+                    continue
+                if dist[other] is None or nd < dist[other]:
+                    dist[other] = nd
+                    if nd == d:
+                        queue.appendleft(other)
+                    else:
+                        queue.append(other)
+        
+        if stop_at_goal:
+            return None
+        return dist
+
+    def connection_distance_map(self, player):
+        dist = self.connection_distances(player)
+        return [dist[i * BOARD_SIZE:(i + 1) * BOARD_SIZE] for i in range(BOARD_SIZE)]
+
+    def connection_cost(self, player):
+        # menor número de casas vazias que ainda faltam para ligar as duas bordas
+        return self.connection_distances(player, stop_at_goal=True)
     
     def find_connection_distance(self, x1, y1, x2, y2, player):
         visited = [[False for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-        queue = [(x1, y1, 0)]
+        queue = deque([(x1, y1, 0)])
         visited[x1][y1] = True
         
         while queue:
-            cx, cy, dist = queue.pop(0)
+            cx, cy, dist = queue.popleft()
             if cx == x2 and cy == y2:
                 return dist
             
@@ -197,29 +314,10 @@ class TwixtGame:
         return -1
     
     def count_connection(self, player):
-        count = 0
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                if self.board[i][j] == player:
-                    for dx, dy in DIRECTIONS:
-                        ni, nj = i + dx, j + dy
-                        if 0 <= ni < BOARD_SIZE and 0 <= nj < BOARD_SIZE and self.board[ni][nj] == player:
-                            count += 1
-        return count // 2
+        return self.adjacent_pairs[player]
     
     def evaluate_strategic_positions(self):
-        score = 0
-        center = BOARD_SIZE // 2
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                if self.board[i][j] == PLAYER_1:
-                    distance_to_center = abs(i - center) + abs(j - center)
-                    score += (BOARD_SIZE - distance_to_center)
-                elif self.board[i][j] == PLAYER_2:
-                    distance_to_corner = min(i + j, i + (BOARD_SIZE-1 - j), 
-                                            (BOARD_SIZE-1 - i) + j, (BOARD_SIZE-1 - i) + (BOARD_SIZE-1 - j))
-                    score -= (BOARD_SIZE - distance_to_corner)
-        return score
+        return self.strategic_score
 
     def get_state_str(self):
         state_str = ""
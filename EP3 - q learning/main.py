@@ -1,20 +1,34 @@
 from game import *
 from minimax import *
 from qlearning import *
+from observers import ConsoleObserver
+from mcts import MCTSAIPlayer
 import time
 import os
 
+def ask_time_budget():
+    answer = input("minimax time per move in ms (empty for fixed depth 3): ").strip()
+    return int(answer) if answer else None
+
+def ask_mcts_budget():
+    answer = input("mcts time per move in ms (empty for 2000 playouts): ").strip()
+    return int(answer) if answer else None
+
 def play_game():
     game = TwixtGame()
+    game.add_observer(ConsoleObserver())
     
     q_agent = QLearningAgent()
-    if os.path.exists('twixt_q_learning_final.pkl'):
+    if os.path.exists('twixt_q_learning_final.qtab'):
+        q_agent.load_mmap('twixt_q_learning_final.qtab')
+    elif os.path.exists('twixt_q_learning_final.pkl'):
         q_agent.load_data('twixt_q_learning_final.pkl')
     
     print("choose the players:")
     print("1. human")
     print("2. minimax")
     print("3. q-learning")
+    print("4. mcts")
     
     player1_choice = int(input("player 1 (X): "))
     player2_choice = int(input("player 2 (O): "))
@@ -24,15 +38,19 @@ def play_game():
     
     if player1_choice == 2:
         depth1 = int(3)
-        player1 = MinimaxAIPlayer(game, PLAYER_1, depth=depth1)
+        player1 = MinimaxAIPlayer(game, PLAYER_1, depth=depth1, time_budget_ms=ask_time_budget())
     elif player1_choice == 3:
-        player1 = QLearningAIPlayer(q_agent)
+        player1 = QLearningAIPlayer(q_agent, use_book=True)
+    elif player1_choice == 4:
+        player1 = MCTSAIPlayer(game, PLAYER_1, time_budget_ms=ask_mcts_budget())
     
     if player2_choice == 2:
         depth2 = int(3)
-        player2 = MinimaxAIPlayer(game, PLAYER_2, depth=depth2)
+        player2 = MinimaxAIPlayer(game, PLAYER_2, depth=depth2, time_budget_ms=ask_time_budget())
     elif player2_choice == 3:
-        player2 = QLearningAIPlayer(q_agent)
+        player2 = QLearningAIPlayer(q_agent, use_book=True)
+    elif player2_choice == 4:
+        player2 = MCTSAIPlayer(game, PLAYER_2, time_budget_ms=ask_mcts_budget())
 
     print(Fore.RED + "player 1 (X) connects top to bottom." + Style.RESET_ALL)
     print(Fore.BLUE + "player 2 (O) connects left to right." + Style.RESET_ALL)
@@ -47,10 +65,10 @@ def play_game():
         if game.current_player == PLAYER_1:
             print("player 1's turn (X)")
             if player1:
-                if isinstance(player1, MinimaxAIPlayer):
-                    player1.make_move()
-                else:
+                if isinstance(player1, QLearningAIPlayer):
                     player1.make_move(game)
+                else:
+                    player1.make_move()
             else:
                 try:
                     x, y = map(int, input("coordinates (x y): ").split())
@@ -62,10 +80,10 @@ def play_game():
         else:
             print("player 2's turn (O)")
             if player2:
-                if isinstance(player2, MinimaxAIPlayer):
-                    player2.make_move()
-                else: 
+                if isinstance(player2, QLearningAIPlayer):
                     player2.make_move(game)
+                else:
+                    player2.make_move()
             else:
                 try:
                     x, y = map(int, input("coordinates (x y): ").split())
@@ -103,7 +121,10 @@ def main():
     elif choice == 3:
         agent = QLearningAgent()
         
-        if os.path.exists('twixt_q_learning_final.pkl'):
+        if os.path.exists('twixt_q_learning_final.qtab'):
+            agent.load_mmap('twixt_q_learning_final.qtab')
+            print("trained agent loaded successfully.")
+        elif os.path.exists('twixt_q_learning_final.pkl'):
             agent.load_data('twixt_q_learning_final.pkl')
             print("trained agent loaded successfully.")
         else:
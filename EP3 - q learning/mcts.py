@@ -0,0 +1,201 @@
+import math
+import random
+import time
+from game import BOARD_SIZE, PLAYER_1, PLAYER_2
+from bitboard import NUM_CELLS, FULL_MASK, TOP_ROW, BOTTOM_ROW, LEFT_COL, RIGHT_COL, MOVES, flood_fill
+
+
+def connected(player, stones):
+    if player == PLAYER_1:
+        return bool(flood_fill(TOP_ROW, stones) & BOTTOM_ROW)
+    return bool(flood_fill(LEFT_COL, stones) & RIGHT_COL)
+
+
+def other(player):
+    return PLAYER_2 if player == PLAYER_1 else PLAYER_1
+
+
+def rollout(x_mask, o_mask, to_move, rng):
+    # preenche as casas vazias ao acaso, alternando os jogadores, e olha as ligações só
+    # no fim. com vizinhança de 8 casas os dois podem acabar ligados no tabuleiro cheio:
+    # aí o vencedor é quem ligou primeiro, achado por busca binária no número de jogadas
+    # (ligar é monótono: com mais peças ninguém se desliga). devolve também o tabuleiro
+    # cheio, usado nas estatísticas AMAF
+    empty = [cell for cell in range(NUM_CELLS) if not (x_mask | o_mask) >> cell & 1]
+    rng.shuffle(empty)
+    order = [(to_move if i % 2 == 0 else other(to_move), 1 << cell) for i, cell in enumerate(empty)]
+
+    def stones_after(k):
+        stones = {PLAYER_1: x_mask, PLAYER_2: o_mask}
+        for player, bit in order[:k]:
+            stones[player] |= bit
+        return stones
+
+    final = stones_after(len(order))
+    x_wins = connected(PLAYER_1, final[PLAYER_1])
+    o_wins = connected(PLAYER_2, final[PLAYER_2])
+    if x_wins != o_wins:
+        return (PLAYER_1 if x_wins else PLAYER_2), final
+    if not x_wins:
+        return None, final
+
+    low, high = 1, len(order)
+    while low < high:
+        middle = (low + high) // 2
+        stones = stones_after(middle)
+        if connected(PLAYER_1, stones[PLAYER_1]) or connected(PLAYER_2, stones[PLAYER_2]):
+            high = middle
+        else:
+            low = middle + 1
+    return order[low - 1][0], final
+
+
+class Node:
+    def __init__(self, x_mask, o_mask, to_move, move=None, parent=None, winner=None):
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.to_move = to_move
+        self.move = move
+        self.parent = parent
+        # quem jogou para chegar aqui: as vitórias do nó são contadas para ele
+        self.player = other(to_move)
+        self.winner = winner
+        self.terminal = winner is not None or not FULL_MASK & ~(x_mask | o_mask)
+        self.children = {}
+        self.untried = [] if self.terminal else [cell for cell in range(NUM_CELLS)
+                                                 if not (x_mask | o_mask) >> cell & 1]
+        self.visits = 0
+        self.wins = 0.0
+        # AMAF (RAVE): simulações em que a jogada deste nó foi feita por self.player
+        # em qualquer momento depois do pai, não só como próxima jogada
+        self.amaf_visits = 0
+        self.amaf_wins = 0.0
+
+    def expand(self, rng):
+        cell = self.untried.pop(rng.randrange(len(self.untried)))
+        bit = 1 << cell
+        x_mask, o_mask = self.x_mask, self.o_mask
+        if self.to_move == PLAYER_1:
+            x_mask |= bit
+            winner = PLAYER_1 if connected(PLAYER_1, x_mask) else None
+        else:
+            o_mask |= bit
+            winner = PLAYER_2 if connected(PLAYER_2, o_mask) else None
+        child = Node(x_mask, o_mask, other(self.to_move), cell, self, winner)
+        self.children[cell] = child
+        return child
+
+    def select_child(self, exploration, rave_equivalence):
+        log_visits = math.log(self.visits)
+
+        def score(c):
+            value = c.wins / c.visits
+            if c.amaf_visits:
+                beta = math.sqrt(rave_equivalence / (3 * c.visits + rave_equivalence))
+                value = (1 - beta) * value + beta * c.amaf_wins / c.amaf_visits
+            return value + exploration * math.sqrt(log_visits / c.visits)
+
+        return max(self.children.values(), key=score)
+
+
+# monte carlo tree search com UCT e RAVE (o preenchimento aleatório diz quais casas cada
+# jogador ocupou, o que dá uma estimativa rápida para todas as jogadas de uma vez). a árvore
+# é mantida entre jogadas: na próxima chamada desce pelas jogadas feitas desde então
+class MCTSAIPlayer:
+    def __init__(self, game, player, playouts=2000, time_budget_ms=None, exploration=0.4, rave_equivalence=300,
+                 seed=None):
+        self.game = game
+        self.player = player
+        self.playouts = playouts
+        self.time_budget_ms = time_budget_ms
+        self.exploration = exploration
+        # quantas visitas até o valor AMAF e o valor normal pesarem igual (0 desliga o RAVE)
+        self.rave_equivalence = rave_equivalence
+        self.rng = random.Random(seed)
+        self.root = None
+        self.root_moves = None
+
+    def current_root(self):
+        game = self.game
+        played = game.played_moves()
+        node = self.root
+        if node is not None and played[:len(self.root_moves)] == self.root_moves:
+            for x, y in played[len(self.root_moves):]:
+                node = node.children.get(x * BOARD_SIZE + y)
+                if node is None:
+                    break
+        else:
+            node = None
+
+        if node is None:
+            x_mask = o_mask = 0
+            for i in range(BOARD_SIZE):
+                for j in range(BOARD_SIZE):
+                    if game.board[i][j] == PLAYER_1:
+                        x_mask |= 1 << (i * BOARD_SIZE + j)
+                    elif game.board[i][j] == PLAYER_2:
+                        o_mask |= 1 << (i * BOARD_SIZE + j)
+            node = Node(x_mask, o_mask, game.current_player)
+        node.parent = None
+        self.root = node
+        self.root_moves = played
+        return node
+
+    def playout(self, root):
+        node = root
+        while not node.terminal and not node.untried and node.children:
+            node = node.select_child(self.exploration, self.rave_equivalence)
+        if not node.terminal and node.untried:
+            node = node.expand(self.rng)
+
+        if node.terminal:
+            winner = node.winner
+            final = {PLAYER_1: node.x_mask, PLAYER_2: node.o_mask}
+        else:
+            winner, final = rollout(node.x_mask, node.o_mask, node.to_move, self.rng)
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1
+            elif winner is None:
+                node.wins += 0.5
+            if self.rave_equivalence and node.children:
+                player = node.to_move
+                played = final[player] & ~(node.x_mask | node.o_mask)
+                reward = 1.0 if winner == player else 0.5 if winner is None else 0.0
+                for cell, child in node.children.items():
+                    if played >> cell & 1:
+                        child.amaf_visits += 1
+                        child.amaf_wins += reward
+            node = node.parent
+
+    def get_best_move(self, playouts=None, time_budget_ms=None):
+        if self.game.is_game_over():
+            return None
+        root = self.current_root()
+        playouts = playouts or self.playouts
+        time_budget_ms = time_budget_ms or self.time_budget_ms
+
+        if time_budget_ms is not None:
+            deadline = time.perf_counter() + time_budget_ms / 1000
+            self.playout(root)
+            while time.perf_counter() < deadline:
+                self.playout(root)
+        else:
+            for _ in range(playouts):
+                self.playout(root)
+
+        # uma jogada que ganha na hora é sempre a escolhida; senão, a mais visitada
+        for cell, child in root.children.items():
+            if child.winner == root.to_move:
+                return MOVES[cell]
+        best = max(root.children.values(), key=lambda c: c.visits)
+        return MOVES[best.move]
+
+    def make_move(self):
+        best_move = self.get_best_move()
+        if best_move:
+            x, y = best_move
+            return self.game.place_pin(x, y)
+        return False
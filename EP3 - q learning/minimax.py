@@ -1,58 +1,235 @@
 from game import *
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from batch_eval import evaluate_batch, children_boards, board_to_array
+from search_stats import SearchStats
+from opening_book import default_book
+from endgame import EndgameSolver, DRAW
+import numpy as np
 import math
+import time
+
+class SearchTimeout(Exception):
+    pass
 
 class MinimaxAIPlayer:
-    def __init__(self, game, player, depth=3):
+    def __init__(self, game, player, depth=3, tt_size=1 << 16, tt_replacement='depth', time_budget_ms=None,
+                 batch_leaves=False, use_book=True, endgame_threshold=14):
         self.game = game
         self.player = player
         self.depth = depth
+        # avalia todos os filhos de um nó de profundidade 1 numa chamada de evaluate_batch
+        self.batch_leaves = batch_leaves
+        self.time_budget_ms = time_budget_ms
+        self.deadline = None
+        # nas primeiras jogadas a resposta vem do livro de aberturas, quando ele existe
+        self.opening_book = default_book() if use_book else None
+        # com até endgame_threshold casas vazias a posição é resolvida até o fim (0 desliga)
+        self.endgame_threshold = endgame_threshold
+        self.endgame = EndgameSolver() if endgame_threshold else None
+        # nós visitados por minimax desde a criação do jogador (usado pelos benchmarks)
+        self.nodes = 0
+        # SearchStats da busca em andamento, só quando get_best_move pede (return_stats)
+        self.stats = None
+        # mantida entre chamadas de get_best_move durante a partida
+        self.tt = TranspositionTable(tt_size, tt_replacement)
     
-    def get_best_move(self):
+    def get_best_move(self, time_budget_ms=None, return_stats=False):
+        if return_stats:
+            return self.get_best_move_with_stats(time_budget_ms)
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
+        if time_budget_ms is None:
+            known_move = self.known_move()
+            if known_move is not None:
+                return known_move
+            return self.search_root(self.depth, self.game.get_valid_moves())[0]
+
+        # com tempo limitado o resolvedor de finais tem metade do prazo; se não terminar,
+        # o aprofundamento iterativo usa o que sobrou
+        start = time.perf_counter()
+        known_move = self.known_move(start + time_budget_ms / 2000)
+        if known_move is not None:
+            return known_move
+        remaining_ms = time_budget_ms - (time.perf_counter() - start) * 1000
+        return self.iterative_deepening(remaining_ms)
+
+    def known_move(self, deadline=None):
+        # jogada sem busca: do livro de aberturas ou do resolvedor de finais
+        if self.opening_book is not None:
+            move = self.opening_book.lookup(self.game)
+            if move is not None:
+                return move
+        return self.endgame_move(deadline)
+
+    def endgame_move(self, deadline=None):
+        if self.endgame is None or len(self.game.get_valid_moves()) > self.endgame_threshold:
+            return None
+        value, move = self.endgame.solve(self.game, deadline)
+        if value is None:
+            return None
+        # numa posição perdida qualquer jogada perde; a busca heurística ao menos
+        # escolhe a que dá mais trabalho a um adversário que não joga perfeito
+        return move if value >= DRAW else None
+
+    def get_best_move_with_stats(self, time_budget_ms=None):
+        stats = SearchStats(self.game.current_player, self.game.state_key)
+        self.stats = stats
+        start = time.perf_counter()
+        try:
+            stats.best_move = self.get_best_move(time_budget_ms)
+        finally:
+            self.stats = None
+        stats.seconds = time.perf_counter() - start
+        return stats.best_move, stats
+
+    def iterative_deepening(self, time_budget_ms):
+        game = self.game
+        moves = game.get_valid_moves()
+        if not moves:
+            return None
+
+        # aprofunda um nível por vez; a melhor jogada da iteração anterior vai primeiro
+        # e o restante da variação principal sai das jogadas guardadas na tabela
+        best_move = moves[0]
+        root_history = len(game.history)
+        self.deadline = time.perf_counter() + time_budget_ms / 1000
+        try:
+            for depth in range(1, len(moves) + 1):
+                move, value = self.search_root(depth, moves)
+                best_move = move
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(value) >= 10000:
+                    break
+        except SearchTimeout:
+            while len(game.history) > root_history:
+                game.unmake_move()
+        finally:
+            self.deadline = None
+        return best_move
+
+    def search_root(self, depth, moves):
+        game = self.game
+        # evaluate_func é do ponto de vista de PLAYER_1: quem joga com O minimiza
+        maximizing = game.current_player == PLAYER_1
         best_move = None
-        best_value = -math.inf
-        legal_moves = self.game.get_valid_moves()
+        best_value = -math.inf if maximizing else math.inf
         
-        for move in legal_moves:
-            new_game = self.game.successor_func(move)
-            if new_game is None:
-                continue
-            value = self.minimax(new_game, self.depth-1, -math.inf, math.inf, False)
-            if value > best_value:
+        stats = self.stats
+        for move in moves:
+            if stats is not None:
+                start = time.perf_counter()
+            game.make_move(move)
+            value = self.minimax(game, depth-1, -math.inf, math.inf, not maximizing)
+            game.unmake_move()
+            if stats is not None:
+                stats.root_moves.append((depth, move, value, time.perf_counter() - start))
+            if (value > best_value) if maximizing else (value < best_value):
                 best_value = value
                 best_move = move
-        return best_move
+        if stats is not None:
+            stats.depth = depth
+        return best_move, best_value
     
     def minimax(self, game, depth, alpha, beta, maximizing):
-        if depth == 0 or game.game_over:
+        self.nodes += 1
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+        if game.game_over:
+            if stats is not None:
+                stats.evaluations += 1
             return game.evaluate_func()
-            
-        if maximizing:
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        # só reaproveita valores da mesma profundidade, para o resultado ser igual ao da
+        # busca sem tabela; entradas de outras profundidades ainda ordenam as jogadas
+        entry = self.tt.probe(game.hash)
+        if depth == 0:
+            # as transposições de uma busca rasa caem quase todas nas folhas
+            if entry is not None and entry[1] == 0:
+                if stats is not None:
+                    stats.tt_hits += 1
+                return entry[3]
+            if stats is not None:
+                stats.evaluations += 1
+            value = game.evaluate_func()
+            self.tt.store(game.hash, 0, EXACT, value, None)
+            return value
+
+        alpha_orig, beta_orig = alpha, beta
+        moves = game.get_valid_moves()
+        if entry is not None:
+            _, entry_depth, flag, entry_value, hint = entry
+            if entry_depth == depth:
+                if flag == EXACT:
+                    if stats is not None:
+                        stats.tt_hits += 1
+                    return entry_value
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    if stats is not None:
+                        stats.tt_hits += 1
+                    return entry_value
+            if hint is not None:
+                moves.remove(hint)
+                moves.insert(0, hint)
+
+        best_move = None
+        if stats is not None:
+            stats.expanded += 1
+        if depth == 1 and self.batch_leaves:
+            values = evaluate_batch(children_boards(board_to_array(game), moves, game.current_player))
+            best = int(np.argmax(values)) if maximizing else int(np.argmin(values))
+            value = float(values[best])
+            best_move = moves[best]
+            if stats is not None:
+                stats.evaluations += len(moves)
+        elif maximizing:
             value = -math.inf
-            for move in game.get_valid_moves():
-                new_game = game.successor_func(move)
-                if new_game is None:
-                    continue
-                value = max(value, self.minimax(new_game, depth-1, alpha, beta, False))
+            for i, move in enumerate(moves):
+                game.make_move(move)
+                child = self.minimax(game, depth-1, alpha, beta, False)
+                game.unmake_move()
+                if child > value:
+                    value = child
+                    best_move = move
                 alpha = max(alpha, value)
                 if alpha >= beta:
+                    if stats is not None:
+                        stats.count_cutoff(i)
                     break
-            return value
         else:
             value = math.inf
-            for move in game.get_valid_moves():
-                new_game = game.successor_func(move)
-                if new_game is None:
-                    continue
-                value = min(value, self.minimax(new_game, depth-1, alpha, beta, True))
+            for i, move in enumerate(moves):
+                game.make_move(move)
+                child = self.minimax(game, depth-1, alpha, beta, True)
+                game.unmake_move()
+                if child < value:
+                    value = child
+                    best_move = move
                 beta = min(beta, value)
                 if alpha >= beta:
+                    if stats is not None:
+                        stats.count_cutoff(i)
                     break
-            return value
+
+        if value <= alpha_orig:
+            flag = UPPER_BOUND
+        elif value >= beta_orig:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.tt.store(game.hash, depth, flag, value, best_move)
+        return value
 
     def make_move(self):
         best_move = self.get_best_move()
         if best_move:
             x, y = best_move
-            print(f"minimax ({self.player}) played at ({x}, {y})")
             return self.game.place_pin(x, y)
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,55 @@
+import os
+import pickle
+from collections import OrderedDict
+
+
+# cache posição -> melhor jogada do minimax, com no máximo max_size entradas e descarte
+# da usada há mais tempo (LRU). a chave é (hash de zobrist, profundidade): as chaves de
+# zobrist têm semente fixa, então o cache salvo vale para as próximas execuções
+class MoveCache:
+    def __init__(self, max_size=100000, filename=None, track_new=False):
+        self.max_size = max_size
+        self.filename = filename
+        self.entries = OrderedDict()
+        # com track_new, as entradas novas ficam guardadas até drain_new (usado pelos
+        # processos do treino paralelo, que mandam o que aprenderam para o pai)
+        self.new_entries = [] if track_new else None
+        self.hits = 0
+        self.misses = 0
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        move = self.entries.get(key)
+        if move is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return move
+
+    def put(self, key, move):
+        if self.new_entries is not None and key not in self.entries:
+            self.new_entries.append((key, move))
+        self.entries[key] = move
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def drain_new(self):
+        new_entries, self.new_entries = self.new_entries, []
+        return new_entries
+
+    def save(self, filename=None):
+        filename = filename or self.filename
+        with open(filename + '.tmp', 'wb') as f:
+            pickle.dump(list(self.entries.items()), f)
+        os.replace(filename + '.tmp', filename)
+
+    def load(self, filename):
+        with open(filename, 'rb') as f:
+            for key, move in pickle.load(f):
+                self.put(key, move)
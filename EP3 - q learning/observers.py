@@ -0,0 +1,19 @@
+# o jogo não faz I/O: quem quiser mostrar ou registrar as jogadas se inscreve como
+# observador. o padrão é nenhum observador (treino, avaliação e busca)
+class GameObserver:
+    def on_move(self, game, player, move):
+        pass
+
+    def on_game_over(self, game, winner):
+        # winner é None quando o jogo acaba empatado
+        pass
+
+
+class ConsoleObserver(GameObserver):
+    def on_move(self, game, player, move):
+        x, y = move
+        print(f"{player} played at ({x}, {y})")
+        game.print_board()
+
+    def on_game_over(self, game, winner):
+        game.print_board()
@@ -0,0 +1,45 @@
+import os
+import numpy as np
+from qtable import index_action
+
+BOOK_FILE = 'opening_book.npz'
+
+
+# livro de aberturas: chave do estado -> índice da melhor jogada. no arquivo ficam só
+# dois arrays ordenados
+class OpeningBook:
+    def __init__(self, keys, moves, plies=0, depth=0):
+        self.moves = {int(key): int(move) for key, move in zip(keys, moves)}
+        self.plies = plies
+        self.depth = depth
+
+    def __len__(self):
+        return len(self.moves)
+
+    def lookup(self, game):
+        move = self.moves.get(game.state_key)
+        if move is None:
+            return None
+        x, y = index_action(move)
+        return (x, y) if game.is_valid_move(x, y) else None
+
+    def save(self, filename=BOOK_FILE):
+        keys = np.array(sorted(self.moves), dtype=np.int64)
+        moves = np.array([self.moves[key] for key in keys], dtype=np.uint8)
+        np.savez_compressed(filename, keys=keys, moves=moves, plies=self.plies, depth=self.depth)
+
+    @classmethod
+    def load(cls, filename=BOOK_FILE):
+        with np.load(filename) as data:
+            return cls(data['keys'], data['moves'], int(data['plies']), int(data['depth']))
+
+
+_default_book = None
+
+
+def default_book():
+    # o livro do diretório atual, lido uma vez só; None se ainda não foi gerado
+    global _default_book
+    if _default_book is None and os.path.exists(BOOK_FILE):
+        _default_book = OpeningBook.load(BOOK_FILE)
+    return _default_book
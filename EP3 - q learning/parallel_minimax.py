@@ -0,0 +1,118 @@
+import math
+import multiprocessing
+import os
+from game import PLAYER_1
+from minimax import MinimaxAIPlayer
+
+# estado de cada processo do pool: um MinimaxAIPlayer com tabela de transposição
+# que continua aquecida entre jogadas, e o melhor valor da raiz compartilhado
+_worker = None
+_shared_bound = None
+_game_class = None
+
+
+def _init_worker(shared_bound, game_class, tt_size, tt_replacement):
+    global _worker, _shared_bound, _game_class
+    _shared_bound = shared_bound
+    _game_class = game_class
+    _worker = MinimaxAIPlayer(game_class(), None, tt_size=tt_size, tt_replacement=tt_replacement, use_book=False)
+
+
+def _search_root_move(task):
+    moves, index, move, depth, maximizing = task
+    game = _game_class()
+    for played in moves:
+        game.make_move(played)
+    game.make_move(move)
+    _worker.game = game
+
+    # o limite é guardado do ponto de vista de quem joga na raiz (maior é melhor)
+    bound = _shared_bound.value
+    if maximizing:
+        value = _worker.minimax(game, depth - 1, bound, math.inf, False)
+        score = value
+    else:
+        value = _worker.minimax(game, depth - 1, -math.inf, -bound, True)
+        score = -value
+
+    exact = score > bound
+    if exact:
+        with _shared_bound.get_lock():
+            if score > _shared_bound.value:
+                _shared_bound.value = score
+    return index, score, exact
+
+
+# divide as jogadas da raiz entre processos (young brothers wait: a primeira jogada
+# é buscada antes, para as outras já começarem com um limite). o resultado é o mesmo
+# da busca serial de mesma profundidade: o melhor valor, com empate para a jogada
+# que vem primeiro em get_valid_moves
+class ParallelMinimaxAIPlayer(MinimaxAIPlayer):
+    def __init__(self, game, player, depth=3, workers=None, **kwargs):
+        super().__init__(game, player, depth=depth, **kwargs)
+        self.workers = workers or os.cpu_count()
+        self.pool = None
+        self.shared_bound = None
+
+    def start_pool(self):
+        if self.pool is None:
+            self.shared_bound = multiprocessing.Value('d', -math.inf)
+            self.pool = multiprocessing.Pool(
+                self.workers, initializer=_init_worker,
+                initargs=(self.shared_bound, type(self.game), self.tt.size, self.tt.replacement))
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def get_best_move(self, time_budget_ms=None, return_stats=False):
+        # com tempo limitado, ou pedindo estatísticas, a busca é a serial (os contadores
+        # dos processos do pool não voltam para cá)
+        if return_stats or time_budget_ms is not None or self.time_budget_ms is not None:
+            return super().get_best_move(time_budget_ms, return_stats)
+        known_move = self.known_move()
+        if known_move is not None:
+            return known_move
+        return self.parallel_search_root(self.depth)[0]
+
+    def parallel_search_root(self, depth):
+        game = self.game
+        moves = game.get_valid_moves()
+        if not moves:
+            return None, None
+        maximizing = game.current_player == PLAYER_1
+        sign = 1 if maximizing else -1
+
+        game.make_move(moves[0])
+        first_value = self.minimax(game, depth - 1, -math.inf, math.inf, not maximizing)
+        game.unmake_move()
+
+        pool = self.start_pool()
+        self.shared_bound.value = sign * first_value
+        played = game.played_moves()
+        tasks = [(played, i, move, depth, maximizing) for i, move in enumerate(moves) if i > 0]
+
+        scores = {0: sign * first_value}
+        exact = {0: True}
+        for index, score, is_exact in pool.imap_unordered(_search_root_move, tasks):
+            scores[index] = score
+            exact[index] = is_exact
+
+        best_score = max(score for i, score in scores.items() if exact[i])
+        best_index = min(i for i, score in scores.items() if exact[i] and score == best_score)
+
+        # um limite superior igual ao melhor valor pode esconder um empate com uma
+        # jogada anterior; essas poucas são refeitas com janela cheia
+        for i in range(best_index):
+            if not exact[i] and scores[i] == best_score:
+                game.make_move(moves[i])
+                value = self.minimax(game, depth - 1, -math.inf, math.inf, not maximizing)
+                game.unmake_move()
+                if sign * value == best_score:
+                    best_index = i
+                    break
+
+        return moves[best_index], sign * best_score
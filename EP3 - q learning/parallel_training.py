@@ -0,0 +1,134 @@
+import multiprocessing
+import os
+import random
+import numpy as np
+from game import TwixtGame
+from qlearning import QLearningAgent, QLearningAIPlayer
+from qtable import QTable, SharedQTable
+from move_cache import MoveCache
+
+
+# cada processo joga episódios contra o minimax e atualiza direto a tabela compartilhada,
+# com seu próprio gerador e seu próprio epsilon. os episódios são distribuídos por um
+# contador compartilhado e o resultado de cada um volta para o processo pai pela fila,
+# junto com as jogadas novas do cache do minimax quando ele é salvo em arquivo
+def _train_worker(worker_id, table_name, capacity, lock, claimed, results, episodes,
+                  minimax_depth, game_class, symmetry, epsilon, decay, seed, opponent_cache_size,
+                  opponent_cache_file):
+    random.seed(seed)
+    np.random.seed(seed)
+    table = SharedQTable.attach(table_name, capacity, lock)
+    agent = QLearningAgent(epsilon=epsilon, decay=decay, symmetry=symmetry)
+    agent.q_table = table
+    # cada processo tem seu cache do minimax; o arquivo, se houver, é lido aqui e
+    # escrito só pelo pai
+    opponent_cache = None
+    if opponent_cache_size:
+        opponent_cache = MoveCache(opponent_cache_size, opponent_cache_file, track_new=bool(opponent_cache_file))
+
+    try:
+        while True:
+            with claimed.get_lock():
+                if claimed.value >= episodes:
+                    break
+                claimed.value += 1
+            won, total_reward = QLearningAIPlayer.play_training_episode(agent, minimax_depth, game_class, opponent_cache)
+            agent.decay_epsilon()
+            new_moves = opponent_cache.drain_new() if opponent_cache is not None and opponent_cache_file else []
+            results.put((worker_id, won, total_reward, agent.epsilon, new_moves))
+    except Exception as error:
+        results.put((worker_id, None, repr(error), None, None))
+        raise
+    finally:
+        agent.q_table = None
+        table.close()
+
+
+def snapshot_agent(table, symmetry, epsilon, training_data):
+    agent = QLearningAgent(epsilon=epsilon, symmetry=symmetry)
+    agent.q_table = QTable.from_arrays(*table.to_arrays())
+    agent.training_data = training_data
+    return agent
+
+
+# mesmo treino de train_agent, com os episódios espalhados por vários processos.
+# o pai só junta os resultados e faz os checkpoints (a partir de uma cópia da tabela,
+# os processos continuam jogando enquanto isso)
+def train_agent_parallel(episodes=10000, save_interval=1000, minimax_depth=3, workers=None,
+                         game_class=TwixtGame, symmetry=False, capacity=1 << 18, seed=None,
+                         opponent_cache_size=100000, opponent_cache_file=None):
+    workers = workers or os.cpu_count()
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+
+    base = QLearningAgent(symmetry=symmetry)
+    if os.path.exists('twixt_q_learning.pkl'):
+        base.load_data('twixt_q_learning.pkl')
+
+    lock = multiprocessing.Lock()
+    table = SharedQTable.create(lock, capacity)
+    table.load_arrays(*base.q_table.to_arrays())
+
+    # cada processo decai o epsilon só nos seus episódios; elevando o fator ao número
+    # de processos o epsilon segue, pelo total de episódios, o mesmo ritmo do treino serial
+    decay = base.decay ** workers
+    claimed = multiprocessing.Value('i', 0)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(
+                     target=_train_worker,
+                     args=(i, table.name, capacity, lock, claimed, results, episodes,
+                           minimax_depth, game_class, base.symmetry, base.epsilon, decay, seed + i,
+                           opponent_cache_size, opponent_cache_file))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    # o pai junta as jogadas novas de todos os processos e salva o cache nos checkpoints
+    opponent_cache = None
+    if opponent_cache_size and opponent_cache_file:
+        opponent_cache = MoveCache(opponent_cache_size, opponent_cache_file)
+
+    wins = []
+    evaluation_results = []
+    training_data = base.training_data
+    epsilons = [base.epsilon] * workers
+    try:
+        for episode in range(1, episodes + 1):
+            worker_id, won, total_reward, epsilon, new_moves = results.get()
+            if won is None:
+                raise RuntimeError(f"training worker {worker_id} failed: {total_reward}")
+            if opponent_cache is not None:
+                for key, move in new_moves:
+                    opponent_cache.put(key, move)
+            wins.append(won)
+            training_data.append(total_reward)
+            epsilons[worker_id] = epsilon
+
+            if episode % save_interval == 0:
+                agent = snapshot_agent(table, base.symmetry, float(np.mean(epsilons)), training_data)
+                win_rate = np.mean(wins[-save_interval:]) if wins else 0
+                print(f"episode {episode}: win rate {win_rate:.2f}, epsilon {agent.epsilon:.4f}")
+
+                eval_win_rate = QLearningAIPlayer.evaluate_against_minimax(agent, minimax_depth, games=10, game_class=game_class)
+                evaluation_results.append(eval_win_rate)
+                print(f"  evaluation against minimax: {eval_win_rate:.2f}")
+
+                agent.save_data('twixt_q_learning_temp.pkl', async_save=False)
+                os.replace('twixt_q_learning_temp.pkl', 'twixt_q_learning.pkl')
+                if opponent_cache is not None:
+                    opponent_cache.save()
+
+        for process in processes:
+            process.join()
+        agent = snapshot_agent(table, base.symmetry, float(np.mean(epsilons)), training_data)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        table.close()
+
+    agent.save_data('twixt_q_learning_final.pkl', async_save=False)
+    agent.save_mmap('twixt_q_learning_final.qtab')
+    if opponent_cache is not None:
+        opponent_cache.save()
+    return agent, evaluation_results
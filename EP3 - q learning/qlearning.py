@@ -1,4 +1,3 @@
-from collections import defaultdict
 import numpy as np
 import pickle
 import os
@@ -6,10 +5,20 @@ import random
 import threading
 from game import TwixtGame, PLAYER_1, PLAYER_2
 from minimax import *
+from qtable import QTable, MappedQTable, action_index, index_action, save_mmap
+from symmetry import canonicalize, TRANSFORMS
+from move_cache import MoveCache
+from opening_book import default_book
+from replay import ReplayBuffer
 
 class QLearningAgent:
-    def __init__(self, alpha=0.1, gamma=0.9, epsilon=1.0, min_epsilon=0.01, decay=0.9995):
-        self.q_table = defaultdict(lambda: defaultdict(float))
+    # prefixo dos arquivos de checkpoint de train_agent
+    CHECKPOINT = 'twixt_q_learning'
+
+    def __init__(self, alpha=0.1, gamma=0.9, epsilon=1.0, min_epsilon=0.01, decay=0.9995, symmetry=False):
+        self.q_table = QTable()
+        # guarda uma entrada só por classe de estados simétricos
+        self.symmetry = symmetry
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon
@@ -18,23 +27,29 @@ class QLearningAgent:
         self.training_data = []
         
     def get_state_representation(self, game):
-        return game.get_state_str()
+        return game.state_key
     
     def get_valid_actions(self, game):
         return game.get_valid_moves()
     
+    def canonical_state(self, state):
+        if not self.symmetry:
+            return state, 0
+        return canonicalize(state)
+    
     def get_q_value(self, state, action):
-        return self.q_table[state][action]
+        key, transform = self.canonical_state(state)
+        return self.q_table.get(key, TRANSFORMS[transform][action_index(action)])
     
     def update_q_value(self, state, action, reward, next_state):
-        if next_state not in self.q_table or not self.q_table[next_state]:
-            best_next = 0
-        else:
-            best_next = max(self.q_table[next_state].values())
+        # o máximo de uma linha não depende do referencial, só da chave canônica
+        best_next = self.q_table.max_value(self.canonical_state(next_state)[0])
         
+        key, transform = self.canonical_state(state)
+        index = TRANSFORMS[transform][action_index(action)]
         td_target = reward + self.gamma * best_next
-        td_error = td_target - self.get_q_value(state, action)
-        self.q_table[state][action] += self.alpha * td_error
+        td_error = td_target - self.q_table.get(key, index)
+        self.q_table.update(key, index, self.alpha * td_error)
     
     def choose_action(self, game, training_mode=True):
         state = self.get_state_representation(game)
@@ -47,11 +62,59 @@ class QLearningAgent:
         if training_mode and np.random.rand() < self.epsilon:
             return random.choice(valid_actions)  # exploração
         else:
-            q_values = [self.get_q_value(state, a) for a in valid_actions]
-            max_q = max(q_values) if q_values else 0
+            key, transform = self.canonical_state(state)
+            row = self.q_table.row(key)
+            if row is None:
+                return random.choice(valid_actions)
+            permutation = TRANSFORMS[transform]
+            q_values = row[[permutation[action_index(a)] for a in valid_actions]]
+            max_q = q_values.max()
             best_actions = [a for a, q in zip(valid_actions, q_values) if q == max_q]
             return random.choice(best_actions) if best_actions else None
     
+    # versões em lote para VecTwixtEnv: estados são chaves, ações são índices x * BOARD_SIZE + y
+    # e valid_masks é a matriz K x BOARD_SIZE² das casas livres de cada jogo
+    def choose_actions(self, states, valid_masks, training_mode=True):
+        k = len(states)
+        q_values = np.zeros(valid_masks.shape, dtype=np.float32)
+        seen = np.zeros(k, dtype=bool)
+        for i, state in enumerate(states):
+            key, transform = self.canonical_state(int(state))
+            row = self.q_table.row(key)
+            if row is not None:
+                q_values[i] = row[TRANSFORMS[transform]]
+                seen[i] = True
+        
+        # estados nunca vistos e os sorteados pelo ε-greedy escolhem ao acaso
+        explore = ~seen
+        if training_mode:
+            explore |= np.random.rand(k) < self.epsilon
+        q_values[explore] = 0.0
+        q_values[~valid_masks] = -np.inf
+        
+        # empates decididos ao acaso, como em choose_action
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        return np.argmax(np.where(best & valid_masks, np.random.rand(*q_values.shape), -1.0), axis=1)
+    
+    def update_q_values(self, states, actions, rewards, next_states):
+        for state, action, reward, next_state in zip(states, actions, rewards, next_states):
+            self.update_q_value(int(state), index_action(int(action)), float(reward), int(next_state))
+    
+    def replay_update(self, buffer, batch_size=64):
+        # uma atualização TD em lote com transições sorteadas do buffer: alvo, erro e
+        # incremento calculados em arrays, a tabela acessada uma vez por estado
+        states, actions, rewards, next_states, dones = buffer.sample(batch_size)
+        if self.symmetry:
+            canonical = [canonicalize(int(s)) for s in states]
+            states = [key for key, _ in canonical]
+            actions = [TRANSFORMS[t][a] for (_, t), a in zip(canonical, actions)]
+            next_states = [canonicalize(int(s))[0] for s in next_states]
+        
+        best_next = np.where(dones, 0.0, self.q_table.max_values(next_states))
+        td_target = rewards + self.gamma * best_next
+        td_error = td_target - self.q_table.get_many(states, actions)
+        self.q_table.add_many(states, actions, (self.alpha * td_error).astype(np.float32))
+    
     def decay_epsilon(self):
         self.epsilon = max(self.min_epsilon, self.epsilon * self.decay)
     
@@ -62,86 +125,137 @@ class QLearningAgent:
             self._save_data(filename)
     
     def _save_data(self, filename):
-        q_table_serializable = {state: dict(actions) for state, actions in self.q_table.items()}
+        q_keys, q_values = self.q_table.to_arrays()
         with open(filename, 'wb') as f:
             pickle.dump({
-                'q_table': q_table_serializable,
+                'q_keys': q_keys,
+                'q_values': q_values,
+                'symmetry': self.symmetry,
                 'epsilon': self.epsilon,
                 'training_data': self.training_data
             }, f)
     
+    def save_mmap(self, filename):
+        q_keys, q_values = self.q_table.to_arrays()
+        save_mmap(filename, q_keys, q_values, symmetry=self.symmetry, epsilon=self.epsilon)
+    
+    def load_mmap(self, filename):
+        # abre o arquivo sem carregar a tabela: os processos compartilham as mesmas páginas
+        self.q_table = MappedQTable(filename)
+        self.symmetry = self.q_table.symmetry
+        self.epsilon = self.q_table.epsilon
+    
     def load_data(self, filename):
         if os.path.exists(filename):
             with open(filename, 'rb') as f:
                 data = pickle.load(f)
-                self.q_table = defaultdict(lambda: defaultdict(float))
-                for state, actions in data['q_table'].items():
-                    self.q_table[state] = defaultdict(float, actions)
+                if 'q_keys' in data:
+                    self.q_table = QTable.from_arrays(data['q_keys'], data['q_values'])
+                    self.symmetry = data.get('symmetry', False)
+                else:
+                    # checkpoints antigos: dicionário aninhado com o estado em string
+                    self.q_table = QTable.from_legacy(data['q_table'])
+                    self.symmetry = False
                 self.epsilon = data['epsilon']
                 self.training_data = data.get('training_data', [])
 
 class QLearningAIPlayer:
-    def __init__(self, agent):
+    def __init__(self, agent, use_book=False):
+        # sem livro por padrão: na avaliação e nos checkpoints as jogadas têm que ser do agente
         self.agent = agent
+        self.opening_book = default_book() if use_book else None
     
     def make_move(self, game):
-        action = self.agent.choose_action(game, training_mode=False)
+        action = self.opening_book.lookup(game) if self.opening_book is not None else None
+        if action is None:
+            action = self.agent.choose_action(game, training_mode=False)
         if action:
             x, y = action
-            print(f"q-learning played at ({x}, {y})")
-            success = game.place_pin(x, y)
-            if not success:
-                print("ERROR: q-learning made an invalid move!")
-            return success
+            return game.place_pin(x, y)
         return False
 
     @staticmethod
-    def train_agent(episodes=10000, save_interval=1000, minimax_depth=3):
-        agent = QLearningAgent()
-        wins = []
-        evaluation_results = []
+    def play_training_episode(agent, minimax_depth, game_class=TwixtGame, opponent_cache=None, replay=None):
+        game = game_class()
+        done = False
+        total_reward = 0
         
-        if os.path.exists('twixt_q_learning.pkl'):
-            agent.load_data('twixt_q_learning.pkl')
-        
-        for episode in range(1, episodes + 1):
-            game = TwixtGame()
-            done = False
-            total_reward = 0
+        while not done:
+            state = agent.get_state_representation(game)
             
-            while not done:
-                state = agent.get_state_representation(game)
-                
-                if game.current_player == PLAYER_1:
-                    action = agent.choose_action(game, training_mode=True)
-                    if action is None:
-                        break
-                        
-                    x, y = action
-                    success = game.place_pin(x, y)
-                    if not success:
-                        continue
-
-                    if game.winner == PLAYER_1:
-                        reward = 100
-                    elif game.winner == PLAYER_2:
-                        reward = -100
-                    elif game.is_game_over():
-                        reward = -10  # draws
-                    else:
-                        reward = game.evaluate_func() * 0.1
+            if game.current_player == PLAYER_1:
+                action = agent.choose_action(game, training_mode=True)
+                if action is None:
+                    break
                     
-                    next_state = agent.get_state_representation(game)
-                    agent.update_q_value(state, action, reward, next_state)
-                    total_reward += reward
-                
+                x, y = action
+                success = game.place_pin(x, y)
+                if not success:
+                    continue
+
+                if game.winner == PLAYER_1:
+                    reward = 100
+                elif game.winner == PLAYER_2:
+                    reward = -100
+                elif game.is_game_over():
+                    reward = -10  # draws
                 else:
-                    minimax_ai = MinimaxAIPlayer(game, PLAYER_2, depth=minimax_depth)
-                    minimax_ai.make_move()
+                    reward = game.evaluate_func() * 0.1
                 
-                done = game.is_game_over()
+                next_state = agent.get_state_representation(game)
+                agent.update_q_value(state, action, reward, next_state)
+                if replay is not None:
+                    replay.add(state, action_index(action), reward, next_state, game.is_game_over())
+                total_reward += reward
             
-            wins.append(1 if game.winner == PLAYER_1 else 0)
+            else:
+                QLearningAIPlayer.opponent_move(game, minimax_depth, opponent_cache)
+            
+            done = game.is_game_over()
+        
+        return (1 if game.winner == PLAYER_1 else 0), total_reward
+
+    @staticmethod
+    def opponent_move(game, minimax_depth, opponent_cache=None):
+        # o minimax de profundidade fixa é determinístico: a mesma posição sempre dá a
+        # mesma jogada, então ela pode vir do cache em vez de uma busca nova
+        if opponent_cache is None:
+            return MinimaxAIPlayer(game, PLAYER_2, depth=minimax_depth).make_move()
+        
+        key = (game.hash, minimax_depth)
+        move = opponent_cache.get(key)
+        if move is None:
+            move = MinimaxAIPlayer(game, PLAYER_2, depth=minimax_depth).get_best_move()
+            if move is None:
+                return False
+            opponent_cache.put(key, move)
+        return game.place_pin(*move)
+
+    @staticmethod
+    def train_agent(episodes=10000, save_interval=1000, minimax_depth=3, game_class=TwixtGame, symmetry=False,
+                    opponent_cache_size=100000, opponent_cache_file=None, replay_capacity=0, replay_batch_size=64,
+                    replay_batches=4, agent=None):
+        # agent: qualquer agente com a interface de QLearningAgent (por exemplo ApproxQAgent);
+        # por padrão uma q-table nova, continuando do último checkpoint se houver
+        if agent is None:
+            agent = QLearningAgent(symmetry=symmetry)
+        checkpoint = agent.CHECKPOINT
+        wins = []
+        evaluation_results = []
+        opponent_cache = MoveCache(opponent_cache_size, opponent_cache_file) if opponent_cache_size else None
+        # com replay_capacity > 0 as transições vão também para um buffer, e depois de cada
+        # episódio replay_batches lotes sorteados dele são reaplicados
+        replay = ReplayBuffer(replay_capacity) if replay_capacity else None
+        
+        if os.path.exists(f'{checkpoint}.pkl'):
+            agent.load_data(f'{checkpoint}.pkl')
+        
+        for episode in range(1, episodes + 1):
+            won, total_reward = QLearningAIPlayer.play_training_episode(agent, minimax_depth, game_class, opponent_cache, replay)
+            if replay is not None:
+                for _ in range(replay_batches):
+                    agent.replay_update(replay, replay_batch_size)
+            wins.append(won)
             agent.decay_epsilon()
             agent.training_data.append(total_reward)
             
@@ -149,24 +263,30 @@ class QLearningAIPlayer:
                 win_rate = np.mean(wins[-save_interval:]) if wins else 0
                 print(f"episode {episode}: win rate {win_rate:.2f}, epsilon {agent.epsilon:.4f}")
                 
-                eval_win_rate = QLearningAIPlayer.evaluate_against_minimax(agent, minimax_depth, games=10)
+                eval_win_rate = QLearningAIPlayer.evaluate_against_minimax(agent, minimax_depth, games=10, game_class=game_class)
                 evaluation_results.append(eval_win_rate)
                 print(f"  evaluation against minimax: {eval_win_rate:.2f}")
                 
-                agent.save_data('twixt_q_learning_temp.pkl', async_save=False)
+                agent.save_data(f'{checkpoint}_temp.pkl', async_save=False)
+                if opponent_cache is not None and opponent_cache_file:
+                    opponent_cache.save()
 
-                if os.path.exists('twixt_q_learning_temp.pkl'):
-                    os.replace('twixt_q_learning_temp.pkl', 'twixt_q_learning.pkl')
+                if os.path.exists(f'{checkpoint}_temp.pkl'):
+                    os.replace(f'{checkpoint}_temp.pkl', f'{checkpoint}.pkl')
                 else:
                     print("warning: temp file not created!")
         
-        agent.save_data('twixt_q_learning_final.pkl', async_save=False)
+        agent.save_data(f'{checkpoint}_final.pkl', async_save=False)
+        if isinstance(agent, QLearningAgent):
+            agent.save_mmap(f'{checkpoint}_final.qtab')
+        if opponent_cache is not None and opponent_cache_file:
+            opponent_cache.save()
         return agent, evaluation_results
 
-    def evaluate_against_minimax(agent, minimax_depth, games=50):
+    def evaluate_against_minimax(agent, minimax_depth, games=50, game_class=TwixtGame, progress=None):
         wins = 0
         for i in range(games):
-            game = TwixtGame()
+            game = game_class()
             q_player = QLearningAIPlayer(agent)
             minimax_player = MinimaxAIPlayer(game, PLAYER_2, depth=minimax_depth)
             
@@ -178,7 +298,8 @@ class QLearningAIPlayer:
             
             if game.winner == PLAYER_1:
                 wins += 1
-            print(f"match {i+1}/{games} - agent wins: {wins}")
+            if progress:
+                progress(i + 1, games, wins)
         
         return wins / games
 
@@ -0,0 +1,358 @@
+import os
+import numpy as np
+from multiprocessing import shared_memory
+from game import BOARD_SIZE
+
+NUM_ACTIONS = BOARD_SIZE * BOARD_SIZE
+# a chave em base 3 cabe em int64 até tabuleiros 6x6
+KEY_DTYPE = np.int64 if 3 ** NUM_ACTIONS < 2 ** 63 else object
+
+
+def action_index(action):
+    x, y = action
+    return x * BOARD_SIZE + y
+
+
+def index_action(index):
+    return index // BOARD_SIZE, index % BOARD_SIZE
+
+
+def occupied_cells(state):
+    # decodifica a chave em base 3: casas com dígito diferente de 0
+    occupied = []
+    for cell in range(NUM_ACTIONS - 1, -1, -1):
+        state, digit = divmod(state, 3)
+        if digit:
+            occupied.append(cell)
+    return occupied
+
+
+# q-table compacta: chave inteira do estado -> linha de uma matriz float32 com o valor
+# de todas as BOARD_SIZE² ações. casas ocupadas ficam com -inf. leituras não inserem
+class QTable:
+    def __init__(self, capacity=1024):
+        self.index = {}
+        self.values = np.zeros((capacity, NUM_ACTIONS), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, state):
+        return state in self.index
+
+    def row(self, state):
+        i = self.index.get(state)
+        return None if i is None else self.values[i]
+
+    def get(self, state, action):
+        i = self.index.get(state)
+        return 0.0 if i is None else float(self.values[i, action])
+
+    def max_value(self, state):
+        i = self.index.get(state)
+        if i is None:
+            return 0.0
+        best = float(self.values[i].max())
+        return best if best != -np.inf else 0.0
+
+    def insert(self, state):
+        i = self.index.get(state)
+        if i is not None:
+            return i
+
+        i = len(self.index)
+        if i == len(self.values):
+            grown = np.zeros((2 * len(self.values), NUM_ACTIONS), dtype=np.float32)
+            grown[:i] = self.values
+            self.values = grown
+        self.values[i] = 0.0
+        self.values[i, occupied_cells(state)] = -np.inf
+        self.index[state] = i
+        return i
+
+    def update(self, state, action, delta):
+        i = self.insert(state)
+        self.values[i, action] += delta
+
+    # versões em lote (usadas pelo replay): uma consulta ao dicionário por estado,
+    # o resto é feito direto na matriz
+    def rows(self, states):
+        return np.fromiter((self.index.get(int(s), -1) for s in states), dtype=np.int64, count=len(states))
+
+    def get_many(self, states, actions):
+        rows = self.rows(states)
+        found = rows >= 0
+        values = np.zeros(len(rows), dtype=np.float32)
+        values[found] = self.values[rows[found], np.asarray(actions)[found]]
+        return values
+
+    def max_values(self, states):
+        rows = self.rows(states)
+        found = rows >= 0
+        best = np.zeros(len(rows), dtype=np.float32)
+        if found.any():
+            row_max = self.values[rows[found]].max(axis=1)
+            best[found] = np.where(row_max == -np.inf, 0.0, row_max)
+        return best
+
+    def add_many(self, states, actions, deltas):
+        rows = [self.insert(int(s)) for s in states]
+        # np.add.at soma também quando o mesmo par (estado, ação) aparece mais de uma vez
+        np.add.at(self.values, (rows, np.asarray(actions)), deltas)
+
+    def keys(self):
+        return np.fromiter(self.index.keys(), dtype=KEY_DTYPE, count=len(self.index))
+
+    def matrix(self):
+        return self.values[:len(self.index)]
+
+    def to_arrays(self):
+        return self.keys(), self.matrix().copy()
+
+    @classmethod
+    def from_arrays(cls, keys, values):
+        table = cls(capacity=max(len(keys), 1))
+        table.values[:len(keys)] = values
+        table.index = {int(key): i for i, key in enumerate(keys)}
+        return table
+
+    @classmethod
+    def from_legacy(cls, q_table):
+        # formato antigo: {estado como string de '0'/'1'/'2': {(x, y): valor}}
+        table = cls(capacity=max(len(q_table), 1))
+        for state_str, actions in q_table.items():
+            state = int(state_str, 3)
+            i = table.insert(state)
+            for action, value in actions.items():
+                table.values[i, action_index(action)] = value
+        return table
+
+
+# formato em disco para abrir com mmap sem copiar: cabeçalho fixo, chaves ordenadas
+# (int64) e a matriz de valores (float32) contígua logo depois
+MMAP_MAGIC = b'TWQT'
+MMAP_VERSION = 1
+MMAP_HEADER = np.dtype([('magic', 'S4'), ('version', '<u4'), ('states', '<u8'),
+                        ('actions', '<u4'), ('symmetry', '<u4'), ('epsilon', '<f8')])
+
+
+def save_mmap(filename, keys, values, symmetry=False, epsilon=0.0):
+    if KEY_DTYPE is object:
+        raise ValueError("state keys do not fit in int64 for this board size")
+    order = np.argsort(keys)
+    header = np.zeros(1, dtype=MMAP_HEADER)
+    header[0] = (MMAP_MAGIC, MMAP_VERSION, len(keys), NUM_ACTIONS, int(symmetry), epsilon)
+    # arquivo novo e os.replace: quem já mapeou o antigo continua lendo o inode antigo
+    with open(filename + '.tmp', 'wb') as f:
+        header.tofile(f)
+        np.asarray(keys, dtype='<i8')[order].tofile(f)
+        np.asarray(values, dtype='<f4')[order].tofile(f)
+    os.replace(filename + '.tmp', filename)
+
+
+# leitura direto do arquivo mapeado (busca binária nas chaves); o que for atualizado
+# vai para uma QTable em memória por cima, e o arquivo nunca é escrito
+class MappedQTable:
+    def __init__(self, filename):
+        header = np.fromfile(filename, dtype=MMAP_HEADER, count=1)[0]
+        if header['magic'] != MMAP_MAGIC or header['version'] != MMAP_VERSION:
+            raise ValueError(f"{filename} is not a q-table file")
+        if header['actions'] != NUM_ACTIONS:
+            raise ValueError(f"{filename} was saved for a different board size")
+
+        n = int(header['states'])
+        self.symmetry = bool(header['symmetry'])
+        self.epsilon = float(header['epsilon'])
+        offset = MMAP_HEADER.itemsize
+        if n:
+            self.keys = np.memmap(filename, dtype='<i8', mode='r', offset=offset, shape=(n,))
+            self.values = np.memmap(filename, dtype='<f4', mode='r', offset=offset + 8 * n, shape=(n, NUM_ACTIONS))
+        else:
+            self.keys = np.zeros(0, dtype='<i8')
+            self.values = np.zeros((0, NUM_ACTIONS), dtype='<f4')
+        self.overlay = QTable()
+
+    def find(self, state):
+        i = int(np.searchsorted(self.keys, state))
+        if i < len(self.keys) and self.keys[i] == state:
+            return i
+        return None
+
+    def __len__(self):
+        return len(self.keys) + sum(1 for key in self.overlay.index if self.find(key) is None)
+
+    def __contains__(self, state):
+        return state in self.overlay or self.find(state) is not None
+
+    def row(self, state):
+        row = self.overlay.row(state)
+        if row is not None:
+            return row
+        i = self.find(state)
+        return None if i is None else self.values[i]
+
+    def get(self, state, action):
+        row = self.row(state)
+        return 0.0 if row is None else float(row[action])
+
+    def max_value(self, state):
+        row = self.row(state)
+        if row is None:
+            return 0.0
+        best = float(row.max())
+        return best if best != -np.inf else 0.0
+
+    def insert(self, state):
+        if state not in self.overlay:
+            i = self.find(state)
+            j = self.overlay.insert(state)
+            if i is not None:
+                self.overlay.values[j] = self.values[i]
+        return self.overlay.index[state]
+
+    def update(self, state, action, delta):
+        i = self.insert(state)
+        self.overlay.values[i, action] += delta
+
+    def get_many(self, states, actions):
+        return np.array([self.get(int(s), int(a)) for s, a in zip(states, actions)], dtype=np.float32)
+
+    def max_values(self, states):
+        return np.array([self.max_value(int(s)) for s in states], dtype=np.float32)
+
+    def add_many(self, states, actions, deltas):
+        for s, a, d in zip(states, actions, deltas):
+            self.update(int(s), int(a), d)
+
+    def to_arrays(self):
+        overlay_keys, overlay_values = self.overlay.to_arrays()
+        keep = ~np.isin(self.keys, overlay_keys)
+        return (np.concatenate([np.asarray(self.keys)[keep], overlay_keys]),
+                np.concatenate([np.asarray(self.values)[keep], overlay_values]))
+
+
+# q-table em memória compartilhada para treino com vários processos (estilo hogwild):
+# endereçamento aberto com sondagem linear numa tabela de chaves de tamanho fixo.
+# leituras e atualizações não travam (uma atualização concorrente pode se perder);
+# só a criação de uma linha nova passa pelo lock, para dois processos não pegarem
+# a mesma posição. a linha é preenchida antes de a chave aparecer na tabela
+EMPTY_KEY = -1
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MAX_LOAD = 0.75
+
+
+class SharedQTable:
+    def __init__(self, shm, capacity, lock, owner=False):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.shm = shm
+        self.capacity = capacity
+        self.lock = lock
+        self.owner = owner
+        self.shift = 64 - (capacity.bit_length() - 1)
+        self.count = np.ndarray((1,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self.slots = np.ndarray((capacity,), dtype=np.int64, buffer=shm.buf, offset=8)
+        self.values = np.ndarray((capacity, NUM_ACTIONS), dtype=np.float32, buffer=shm.buf, offset=8 + 8 * capacity)
+
+    @staticmethod
+    def buffer_size(capacity):
+        return 8 + 8 * capacity + 4 * NUM_ACTIONS * capacity
+
+    @classmethod
+    def create(cls, lock, capacity=1 << 18):
+        if KEY_DTYPE is object:
+            raise ValueError("state keys do not fit in int64 for this board size")
+        shm = shared_memory.SharedMemory(create=True, size=cls.buffer_size(capacity))
+        table = cls(shm, capacity, lock, owner=True)
+        table.count[0] = 0
+        table.slots[:] = EMPTY_KEY
+        return table
+
+    @classmethod
+    def attach(cls, name, capacity, lock):
+        return cls(shared_memory.SharedMemory(name=name), capacity, lock)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        # as views precisam sair antes de fechar o buffer
+        del self.count, self.slots, self.values
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def find(self, state):
+        # posição da chave, ou a posição vazia onde ela entraria
+        slots = self.slots
+        mask = self.capacity - 1
+        i = ((state * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> self.shift
+        while True:
+            key = slots[i]
+            if key == state or key == EMPTY_KEY:
+                return i, key == state
+            i = (i + 1) & mask
+
+    def __len__(self):
+        return int(self.count[0])
+
+    def __contains__(self, state):
+        return self.find(state)[1]
+
+    def row(self, state):
+        i, found = self.find(state)
+        return self.values[i] if found else None
+
+    def get(self, state, action):
+        i, found = self.find(state)
+        return float(self.values[i, action]) if found else 0.0
+
+    def max_value(self, state):
+        i, found = self.find(state)
+        if not found:
+            return 0.0
+        best = float(self.values[i].max())
+        return best if best != -np.inf else 0.0
+
+    def insert(self, state):
+        i, found = self.find(state)
+        if found:
+            return i
+
+        with self.lock:
+            i, found = self.find(state)
+            if found:
+                return i
+            if self.count[0] + 1 > MAX_LOAD * self.capacity:
+                raise RuntimeError("shared q-table is full, use a larger capacity")
+            self.values[i] = 0.0
+            self.values[i, occupied_cells(state)] = -np.inf
+            self.slots[i] = state
+            self.count[0] += 1
+        return i
+
+    def update(self, state, action, delta):
+        i = self.insert(state)
+        self.values[i, action] += delta
+
+    def get_many(self, states, actions):
+        return np.array([self.get(int(s), int(a)) for s, a in zip(states, actions)], dtype=np.float32)
+
+    def max_values(self, states):
+        return np.array([self.max_value(int(s)) for s in states], dtype=np.float32)
+
+    def add_many(self, states, actions, deltas):
+        for s, a, d in zip(states, actions, deltas):
+            self.update(int(s), int(a), d)
+
+    def load_arrays(self, keys, values):
+        for key, row in zip(keys, values):
+            self.values[self.insert(int(key))] = row
+
+    def keys(self):
+        return self.slots[self.slots != EMPTY_KEY].copy()
+
+    def to_arrays(self):
+        used = self.slots != EMPTY_KEY
+        return self.slots[used].copy(), self.values[used].copy()
@@ -0,0 +1,44 @@
+import numpy as np
+
+
+# buffer circular de transições (estado, ação, recompensa, próximo estado, fim) em arrays
+# numpy de tamanho fixo; quando enche, as mais antigas são sobrescritas
+class ReplayBuffer:
+    def __init__(self, capacity=100000, seed=None):
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int16)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int64)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done):
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.dones[i] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        n = len(states)
+        i = (self.position + np.arange(n)) % self.capacity
+        self.states[i] = states
+        self.actions[i] = actions
+        self.rewards[i] = rewards
+        self.next_states[i] = next_states
+        self.dones[i] = dones
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def sample(self, batch_size):
+        i = self.rng.integers(0, self.size, size=min(batch_size, self.size))
+        return self.states[i], self.actions[i], self.rewards[i], self.next_states[i], self.dones[i]
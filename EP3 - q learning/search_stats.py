@@ -0,0 +1,62 @@
+import json
+
+
+# contadores de uma chamada de get_best_move. só existe quando pedido: com as
+# estatísticas desligadas a busca não cria este objeto nem conta nada
+class SearchStats:
+    def __init__(self, player, position):
+        self.player = player
+        self.position = position
+        self.best_move = None
+        self.depth = 0
+        self.seconds = 0.0
+        self.nodes = 0
+        # nós que geraram jogadas (os únicos onde pode haver corte)
+        self.expanded = 0
+        self.evaluations = 0
+        self.tt_hits = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        # (profundidade, jogada, valor, segundos) de cada jogada da raiz, em cada iteração
+        self.root_moves = []
+
+    def count_cutoff(self, move_index):
+        self.cutoffs += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+
+    def cutoff_rate(self):
+        return self.cutoffs / self.expanded if self.expanded else 0.0
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        return {
+            'player': self.player,
+            'position': self.position,
+            'best_move': self.best_move,
+            'depth': self.depth,
+            'seconds': self.seconds,
+            'nodes': self.nodes,
+            'nodes_per_second': self.nodes_per_second(),
+            'expanded': self.expanded,
+            'evaluations': self.evaluations,
+            'tt_hits': self.tt_hits,
+            'cutoffs': self.cutoffs,
+            'cutoff_rate': self.cutoff_rate(),
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate(),
+            'root_moves': [{'depth': depth, 'move': move, 'value': value, 'seconds': seconds}
+                           for depth, move, value, seconds in self.root_moves],
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def write_jsonl(self, filename):
+        with open(filename, 'a') as f:
+            f.write(self.to_json() + "\n")
@@ -0,0 +1,66 @@
+from game import BOARD_SIZE
+
+NUM_CELLS = BOARD_SIZE * BOARD_SIZE
+
+
+def mirror_rows(cell):
+    # x -> BOARD_SIZE - 1 - x: troca as bordas de cima e de baixo de PLAYER_1
+    x, y = divmod(cell, BOARD_SIZE)
+    return (BOARD_SIZE - 1 - x) * BOARD_SIZE + y
+
+
+def mirror_columns(cell):
+    # y -> BOARD_SIZE - 1 - y: troca as bordas da esquerda e da direita de PLAYER_2
+    x, y = divmod(cell, BOARD_SIZE)
+    return x * BOARD_SIZE + (BOARD_SIZE - 1 - y)
+
+
+def rotate_180(cell):
+    return mirror_rows(mirror_columns(cell))
+
+
+# simetrias do tabuleiro que preservam o jogo com a vez de jogar tirada da paridade: os
+# dois espelhamentos e a rotação de 180° (os dois juntos) só trocam as bordas de um
+# jogador entre si, e a vizinhança de 8 casas não muda. a transposta com troca de
+# cores leva a tarefa de um jogador na do outro, mas com o mesmo número de peças de
+# cada cor a vez continuaria sendo de PLAYER_1, então ela não vale para estes estados
+TRANSFORMS = [
+    list(range(NUM_CELLS)),
+    [rotate_180(cell) for cell in range(NUM_CELLS)],
+    [mirror_rows(cell) for cell in range(NUM_CELLS)],
+    [mirror_columns(cell) for cell in range(NUM_CELLS)],
+]
+INVERSE_TRANSFORMS = [[perm.index(cell) for cell in range(NUM_CELLS)] for perm in TRANSFORMS]
+
+# peso de cada casa na chave em base 3 depois de transformada
+KEY_WEIGHTS = [[3 ** (NUM_CELLS - 1 - perm[cell]) for cell in range(NUM_CELLS)] for perm in TRANSFORMS]
+
+
+def key_digits(state):
+    digits = []
+    for cell in range(NUM_CELLS - 1, -1, -1):
+        state, digit = divmod(state, 3)
+        if digit:
+            digits.append((cell, digit))
+    return digits
+
+
+def canonicalize(state):
+    # representante canônico = menor chave entre as transformadas; devolve também
+    # o índice da transformada usada, para levar as ações para o mesmo referencial
+    digits = key_digits(state)
+    best, best_transform = state, 0
+    for t in range(1, len(TRANSFORMS)):
+        weights = KEY_WEIGHTS[t]
+        key = sum(digit * weights[cell] for cell, digit in digits)
+        if key < best:
+            best, best_transform = key, t
+    return best, best_transform
+
+
+def transform_action(transform, action):
+    return TRANSFORMS[transform][action]
+
+
+def restore_action(transform, action):
+    return INVERSE_TRANSFORMS[transform][action]
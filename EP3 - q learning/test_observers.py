@@ -0,0 +1,39 @@
+from game import TwixtGame, PLAYER_1
+from observers import GameObserver
+from twixt_engine import LinkTwixtGame
+
+
+class RecordingObserver(GameObserver):
+    def __init__(self):
+        self.moves = []
+        self.game_overs = []
+
+    def on_move(self, game, player, move):
+        self.moves.append((player, move))
+
+    def on_game_over(self, game, winner):
+        self.game_overs.append(winner)
+
+
+def test_win_is_notified_once():
+    game = TwixtGame()
+    observer = RecordingObserver()
+    game.add_observer(observer)
+    for move in [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1), (3, 0), (3, 1), (4, 0), (4, 1), (5, 0)]:
+        assert game.place_pin(*move)
+    assert game.winner == PLAYER_1
+    assert observer.game_overs == [PLAYER_1]
+    assert len(observer.moves) == 11
+
+
+def test_draw_is_notified():
+    # no 3x3 sem cantos não existe salto de cavalo entre casas jogáveis: ninguém liga
+    # as bordas e o jogo acaba quando O fica sem casa livre
+    game = LinkTwixtGame(board_size=3)
+    observer = RecordingObserver()
+    game.add_observer(observer)
+    for move in [(0, 1), (1, 0), (2, 1), (1, 2), (1, 1)]:
+        assert game.place_pin(*move)
+    assert game.game_over
+    assert game.winner is None
+    assert observer.game_overs == [None]
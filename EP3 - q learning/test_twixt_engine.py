@@ -0,0 +1,29 @@
+import random
+from game import PLAYER_1, PLAYER_2
+from minimax import MinimaxAIPlayer
+from twixt_engine import LinkTwixtGame, build_tables
+
+
+def test_interior_link_crosses_nine_others():
+    link_ends, _, crossing, *_ = build_tables(24)
+    link = next(i for i, (a, _) in enumerate(link_ends) if a == 10 * 24 + 10)
+    assert bin(crossing[link]).count('1') == 9
+
+
+def test_minimax_plays_a_full_game():
+    rng = random.Random(0)
+    game = LinkTwixtGame(board_size=8)
+    players = {PLAYER_1: MinimaxAIPlayer(game, PLAYER_1, depth=2, use_book=False, endgame_threshold=0),
+               PLAYER_2: None}
+    while not game.game_over:
+        if players[game.current_player] is not None:
+            assert players[game.current_player].make_move()
+        else:
+            assert game.place_pin(*rng.choice(game.get_valid_moves()))
+
+    assert game.winner == PLAYER_1
+    assert int(game.get_state_str(), 3) == game.state_key
+    assert sum(row.count(PLAYER_1) for row in game.board) == len(game.played_moves()[::2])
+    while game.history:
+        game.unmake_move()
+    assert game.state_key == 0 and game.hash == 0 and game.link_count == {PLAYER_1: 0, PLAYER_2: 0}
@@ -1,11 +1,16 @@
 import matplotlib.pyplot as plt
 from qlearning import *
+from parallel_training import train_agent_parallel
+import evaluation
 
-def main_training():
-    agent, eval_results = QLearningAIPlayer.train_agent(
+def main_training(workers=None, opponent_cache_file=None):
+    # opponent_cache_file: guarda as jogadas do minimax entre execuções do treino
+    agent, eval_results = train_agent_parallel(
         episodes=10000,
         save_interval=1000,
-        minimax_depth=3
+        minimax_depth=3,
+        workers=workers,
+        opponent_cache_file=opponent_cache_file
     )
     
     plt.figure(figsize=(10, 6))
@@ -17,8 +22,8 @@ def main_training():
     plt.savefig('training_performance.png')
     plt.show()
     
-    metrics = QLearningAIPlayer.evaluate_agent(agent, num_games=500)
-    comparison = QLearningAIPlayer.compare_vs_minimax(agent, depth=3, num_games=100)
+    metrics = evaluation.evaluate_agent(agent, num_games=500, workers=workers)
+    comparison = evaluation.compare_vs_minimax(agent, depth=3, num_games=100, workers=workers)
     
     print("\n" + "="*50)
     print("final evaluation results")
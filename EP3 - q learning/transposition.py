@@ -0,0 +1,33 @@
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+REPLACEMENT_POLICIES = ('depth', 'always')
+
+
+# tabela de tamanho fixo indexada pelo hash de zobrist da posição.
+# cada entrada: (hash, profundidade, tipo do limite, valor, melhor jogada)
+class TranspositionTable:
+    def __init__(self, size=1 << 16, replacement='depth'):
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"unknown replacement policy: {replacement}")
+        self.size = size
+        self.replacement = replacement
+        self.entries = [None] * size
+
+    def probe(self, key):
+        entry = self.entries[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, value, best_move):
+        index = key % self.size
+        entry = self.entries[index]
+        # 'depth' só sobrescreve outra posição se a nova busca for pelo menos tão funda
+        if (entry is None or entry[0] == key or self.replacement == 'always'
+                or depth >= entry[1]):
+            self.entries[index] = (key, depth, flag, value, best_move)
+
+    def clear(self):
+        self.entries = [None] * self.size
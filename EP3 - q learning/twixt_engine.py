@@ -0,0 +1,271 @@
+import random
+from colorama import Fore, Style
+from connectivity import ConnectivityTracker
+from game import PLAYER_1, PLAYER_2, EMPTY
+
+# regras de verdade do twixt: pinos ligados por pontes em salto de cavalo, uma ponte não
+# pode cruzar outra (de nenhum jogador) e cada jogador não joga nas bordas do oponente.
+# tabuleiro de torneio é 24x24, sem os quatro cantos
+TOURNAMENT_SIZE = 24
+
+# metade das direções de cavalo (as que descem): cada ponte aparece uma vez só
+LINK_DIRECTIONS = [(1, 2), (2, 1), (2, -1), (1, -2)]
+KNIGHT_DIRECTIONS = LINK_DIRECTIONS + [(-dx, -dy) for dx, dy in LINK_DIRECTIONS]
+
+_tables = {}
+
+
+def crosses(a, b, c, d):
+    # segmentos ab e cd se cruzam no meio; pontes com um pino em comum não contam
+    def orientation(p, q, r):
+        return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+
+    return (orientation(a, b, c) * orientation(a, b, d) < 0
+            and orientation(c, d, a) * orientation(c, d, b) < 0)
+
+
+def build_tables(board_size):
+    if board_size in _tables:
+        return _tables[board_size]
+
+    def playable(x, y):
+        return 0 <= x < board_size and 0 <= y < board_size and (x, y) not in corners
+
+    last = board_size - 1
+    corners = {(0, 0), (0, last), (last, 0), (last, last)}
+
+    # toda ponte possível recebe um índice; link_ends[i] = (casa, casa)
+    link_ends = []
+    link_index = {}
+    for x in range(board_size):
+        for y in range(board_size):
+            for dx, dy in LINK_DIRECTIONS:
+                if playable(x, y) and playable(x + dx, y + dy):
+                    link_index[(x, y, dx, dy)] = len(link_ends)
+                    link_ends.append((x * board_size + y, (x + dx) * board_size + y + dy))
+
+    # para cada casa, as casas a um salto de cavalo e a ponte até elas
+    knight_links = [[] for _ in range(board_size * board_size)]
+    for i, (a, b) in enumerate(link_ends):
+        knight_links[a].append((b, i))
+        knight_links[b].append((a, i))
+
+    # crossing[i]: bits das pontes que cruzam a ponte i. uma ponte que cruza começa no
+    # máximo duas linhas acima ou abaixo e quatro colunas para o lado
+    crossing = [0] * len(link_ends)
+    for (x, y, dx, dy), i in link_index.items():
+        for sx in range(x - 2, x + 3):
+            for sy in range(y - 4, y + 5):
+                for ex, ey in LINK_DIRECTIONS:
+                    j = link_index.get((sx, sy, ex, ey))
+                    if j is not None and crosses((x, y), (x + dx, y + dy), (sx, sy), (sx + ex, sy + ey)):
+                        crossing[i] |= 1 << j
+
+    # X liga cima e baixo e não joga nas colunas das pontas; O o contrário
+    legal = {PLAYER_1: 0, PLAYER_2: 0}
+    for x in range(board_size):
+        for y in range(board_size):
+            if not playable(x, y):
+                continue
+            bit = 1 << (x * board_size + y)
+            if 0 < y < last:
+                legal[PLAYER_1] |= bit
+            if 0 < x < last:
+                legal[PLAYER_2] |= bit
+
+    rng = random.Random(board_size)
+    zobrist = {player: [rng.getrandbits(64) for _ in range(board_size * board_size)]
+               for player in (PLAYER_1, PLAYER_2)}
+    zobrist_side = rng.getrandbits(64)
+
+    _tables[board_size] = (link_ends, knight_links, crossing, legal, zobrist, zobrist_side)
+    return _tables[board_size]
+
+
+# a interface de jogo de TwixtGame que MinimaxAIPlayer usa (make_move/unmake_move,
+# get_valid_moves, evaluate_func, hash, state_key, board), com tamanho configurável. os
+# jogadores de q-learning e o MCTS são feitos para o 6x6 e não rodam aqui. a cada pino
+# as pontes até os próprios pinos a um salto de cavalo são colocadas sozinhas, se não
+# cruzarem nenhuma ponte já posta: isso é um AND com a máscara de pontes do tabuleiro.
+# a vitória é conferida pelo union-find incremental
+class LinkTwixtGame:
+    def __init__(self, board_size=TOURNAMENT_SIZE):
+        self.board_size = board_size
+        (self.link_ends, self.knight_links, self.crossing, self.legal,
+         self.zobrist, self.zobrist_side) = build_tables(board_size)
+        self.pegs = {PLAYER_1: 0, PLAYER_2: 0}
+        self.link_mask = 0
+        self.link_count = {PLAYER_1: 0, PLAYER_2: 0}
+        self.current_player = PLAYER_1
+        self.game_over = False
+        self.winner = None
+        self.connections = ConnectivityTracker(board_size, PLAYER_1, PLAYER_2)
+        self.history = []
+        self.hash = 0
+        self.observers = []
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def owner(self, x, y):
+        return self.connections.owner[x * self.board_size + y]
+
+    @property
+    def board(self):
+        size = self.board_size
+        owner = self.connections.owner
+        return [[owner[i * size + j] or EMPTY for j in range(size)] for i in range(size)]
+
+    def is_valid_move(self, x, y):
+        if not (0 <= x < self.board_size and 0 <= y < self.board_size) or self.game_over:
+            return False
+        bit = 1 << (x * self.board_size + y)
+        return bool(self.legal[self.current_player] & bit) and not (self.pegs[PLAYER_1] | self.pegs[PLAYER_2]) & bit
+
+    def free_cells(self, player):
+        return self.legal[player] & ~(self.pegs[PLAYER_1] | self.pegs[PLAYER_2])
+
+    def get_valid_moves(self):
+        moves = []
+        free = self.free_cells(self.current_player)
+        while free:
+            low = free & -free
+            cell = low.bit_length() - 1
+            moves.append(divmod(cell, self.board_size))
+            free ^= low
+        return moves
+
+    def link_allowed(self, link):
+        return not self.crossing[link] & self.link_mask
+
+    def place_pin(self, x, y):
+        if not self.is_valid_move(x, y):
+            return False
+
+        player = self.current_player
+        self.make_move((x, y))
+        for observer in self.observers:
+            observer.on_move(self, player, (x, y))
+
+        if self.game_over:
+            for observer in self.observers:
+                observer.on_game_over(self, self.winner)
+
+        return True
+
+    # joga sem validar; unmake_move desfaz a última jogada
+    def make_move(self, move):
+        x, y = move
+        player = self.current_player
+        cell = x * self.board_size + y
+        owner = self.connections.owner
+
+        # pontes que saem do mesmo pino nunca se cruzam: basta olhar as que já estavam
+        links = []
+        linked = []
+        for other, link in self.knight_links[cell]:
+            if owner[other] == player and not self.crossing[link] & self.link_mask:
+                links.append(link)
+                linked.append(other)
+        for link in links:
+            self.link_mask |= 1 << link
+        self.link_count[player] += len(links)
+
+        self.history.append((x, y, player, self.game_over, self.winner, self.hash, links))
+        self.pegs[player] |= 1 << cell
+        self.connections.add(player, x, y, linked)
+        self.hash ^= self.zobrist[player][cell]
+
+        opponent = PLAYER_2 if player == PLAYER_1 else PLAYER_1
+        if self.connections.connected(player):
+            self.game_over = True
+            self.winner = player
+        elif not self.free_cells(opponent):
+            self.game_over = True
+        else:
+            self.current_player = opponent
+            self.hash ^= self.zobrist_side
+
+    def unmake_move(self):
+        x, y, player, self.game_over, self.winner, self.hash, links = self.history.pop()
+        self.current_player = player
+        self.pegs[player] &= ~(1 << (x * self.board_size + y))
+        for link in links:
+            self.link_mask &= ~(1 << link)
+        self.link_count[player] -= len(links)
+        self.connections.undo()
+
+    def played_moves(self):
+        return [(x, y) for x, y, *_ in self.history]
+
+    def links(self):
+        # pontes no tabuleiro como ((x1, y1), (x2, y2), jogador)
+        size = self.board_size
+        return [(divmod(self.link_ends[link][0], size), divmod(self.link_ends[link][1], size), player)
+                for _, _, player, _, _, _, links in self.history for link in links]
+
+    def check_win(self):
+        return self.connections.connected(self.current_player)
+
+    def is_game_over(self):
+        return self.game_over
+
+    def longest_span(self, player):
+        # quantas linhas (X) ou colunas (O) o maior grupo ligado do jogador cobre
+        size = self.board_size
+        low, high = {}, {}
+        pegs = self.pegs[player]
+        while pegs:
+            bit = pegs & -pegs
+            cell = bit.bit_length() - 1
+            pegs ^= bit
+            root = self.connections.find(player, cell)
+            position = cell // size if player == PLAYER_1 else cell % size
+            low[root] = min(low.get(root, position), position)
+            high[root] = max(high.get(root, position), position)
+        return max((high[root] - low[root] + 1 for root in low), default=0)
+
+    def evaluate_func(self):
+        # do ponto de vista de PLAYER_1, na mesma escala de TwixtGame.evaluate_func
+        if self.game_over:
+            if self.winner == PLAYER_1:
+                return 10000
+            elif self.winner == PLAYER_2:
+                return -10000
+            else:
+                return 0
+        span = self.longest_span(PLAYER_1) - self.longest_span(PLAYER_2)
+        return span * 4 + (self.link_count[PLAYER_1] - self.link_count[PLAYER_2])
+
+    @property
+    def state_key(self):
+        # a chave em base 3 de game.py (primeira casa é o dígito mais alto). no 24x24 ela
+        # passa de 900 bits, então é montada só quando pedida, e não a cada jogada
+        return int(self.get_state_str(), 3)
+
+    def get_state_str(self):
+        digits = {PLAYER_1: '1', PLAYER_2: '2', None: '0'}
+        return "".join(digits[owner] for owner in self.connections.owner)
+
+    def print_board(self):
+        size = self.board_size
+        last = size - 1
+        print("   " + " ".join(Fore.RED + f"{j:2}" + Style.RESET_ALL for j in range(size)))
+        for i in range(size):
+            print((Fore.RED if i in (0, last) else Fore.BLUE) + f"{i:2} " + Style.RESET_ALL, end="")
+            for j in range(size):
+                owner = self.owner(i, j)
+                if owner == PLAYER_1:
+                    print(" " + Fore.RED + PLAYER_1 + Style.RESET_ALL, end=" ")
+                elif owner == PLAYER_2:
+                    print(" " + Fore.BLUE + PLAYER_2 + Style.RESET_ALL, end=" ")
+                elif (i, j) in ((0, 0), (0, last), (last, 0), (last, last)):
+                    print("  ", end=" ")
+                elif i in (0, last):
+                    print(" " + Fore.RED + EMPTY + Style.RESET_ALL, end=" ")
+                elif j in (0, last):
+                    print(" " + Fore.BLUE + EMPTY + Style.RESET_ALL, end=" ")
+                else:
+                    print(" " + EMPTY, end=" ")
+            print()
+        print(f"{len(self.links())} links")
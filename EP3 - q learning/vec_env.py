@@ -0,0 +1,142 @@
+import numpy as np
+from game import BOARD_SIZE, PLAYER_1, PLAYER_2
+from batch_eval import CELL_CODES, WIN_SCORE, connects_top_bottom, evaluate_batch
+
+NUM_CELLS = BOARD_SIZE * BOARD_SIZE
+X_CODE = CELL_CODES[PLAYER_1]
+O_CODE = CELL_CODES[PLAYER_2]
+
+# mesmo peso de cada casa que game.state_key, para as chaves serem as mesmas da q-table
+CELL_KEY_WEIGHTS = np.array([3 ** (NUM_CELLS - 1 - cell) for cell in range(NUM_CELLS)], dtype=np.int64)
+
+
+# K jogos em paralelo num array K x BOARD_SIZE x BOARD_SIZE (0 vazio, 1 X, 2 O).
+# cada jogo tem sua vez de jogar; step coloca uma peça em todos de uma vez
+class VecTwixtEnv:
+    def __init__(self, num_envs):
+        self.num_envs = num_envs
+        self.boards = np.zeros((num_envs, BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+        self.players = np.full(num_envs, X_CODE, dtype=np.int8)
+        self.state_keys = np.zeros(num_envs, dtype=np.int64)
+        self.moves = np.zeros(num_envs, dtype=np.int32)
+
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.boards[mask] = 0
+        self.players[mask] = X_CODE
+        self.state_keys[mask] = 0
+        self.moves[mask] = 0
+
+    def valid_masks(self):
+        return self.boards.reshape(self.num_envs, NUM_CELLS) == 0
+
+    def step(self, actions, auto_reset=True):
+        # actions: índice x * BOARD_SIZE + y de cada jogo, jogado por quem tem a vez nele.
+        # devolve as chaves depois da jogada, o vencedor (0 = nenhum) e quais terminaram
+        env = np.arange(self.num_envs)
+        flat = self.boards.reshape(self.num_envs, NUM_CELLS)
+        if not (flat[env, actions] == 0).all():
+            raise ValueError("invalid move in vectorized step")
+        flat[env, actions] = self.players
+        self.state_keys += self.players.astype(np.int64) * CELL_KEY_WEIGHTS[actions]
+        self.moves += 1
+
+        # só quem acabou de jogar pode ter ligado suas bordas
+        winners = np.zeros(self.num_envs, dtype=np.int8)
+        x_moved = self.players == X_CODE
+        if x_moved.any():
+            won = connects_top_bottom(self.boards[x_moved] == X_CODE)
+            winners[np.flatnonzero(x_moved)[won]] = X_CODE
+        if (~x_moved).any():
+            o_stones = (self.boards[~x_moved] == O_CODE).transpose(0, 2, 1)
+            won = connects_top_bottom(np.ascontiguousarray(o_stones))
+            winners[np.flatnonzero(~x_moved)[won]] = O_CODE
+
+        done = (winners != 0) | (self.moves == NUM_CELLS)
+        next_keys = self.state_keys.copy()
+        self.players[~done] = np.where(self.players[~done] == X_CODE, O_CODE, X_CODE)
+        if auto_reset and done.any():
+            self.reset(done)
+        return next_keys, winners, done
+
+
+# políticas do adversário: recebem as chaves e as casas livres dos jogos em que é a vez dele
+def random_policy(states, valid_masks):
+    return np.argmax(np.where(valid_masks, np.random.rand(*valid_masks.shape), -1.0), axis=1)
+
+
+def agent_policy(agent, training_mode=False):
+    # adversário que joga com a política (congelada) de um agente
+    def policy(states, valid_masks):
+        return agent.choose_actions(states, valid_masks, training_mode=training_mode)
+    return policy
+
+
+def play_turn(env, agent, opponent, training_mode):
+    # cada jogo joga com quem tem a vez nele: o agente (X) em uns, o adversário nos outros
+    agent_turn = env.players == X_CODE
+    masks = env.valid_masks()
+    actions = np.zeros(env.num_envs, dtype=np.int64)
+    if agent_turn.any():
+        actions[agent_turn] = agent.choose_actions(env.state_keys[agent_turn], masks[agent_turn], training_mode=training_mode)
+    if (~agent_turn).any():
+        actions[~agent_turn] = opponent(env.state_keys[~agent_turn], masks[~agent_turn])
+    return agent_turn, actions
+
+
+# treino em lote do mesmo jeito de train_agent: o agente é X, a recompensa de cada
+# jogada do agente é dada logo depois dela (vitória, empate ou evaluate_func * 0.1)
+def train_batch(agent, episodes=10000, num_envs=256, opponent=random_policy):
+    env = VecTwixtEnv(num_envs)
+    wins = []
+    total_rewards = np.zeros(num_envs)
+    while len(wins) < episodes:
+        states = env.state_keys.copy()
+        agent_turn, actions = play_turn(env, agent, opponent, training_mode=True)
+        next_keys, winners, done = env.step(actions, auto_reset=False)
+
+        if agent_turn.any():
+            rewards = evaluate_batch(env.boards[agent_turn]) * 0.1
+            rewards[winners[agent_turn] == X_CODE] = 100
+            rewards[done[agent_turn] & (winners[agent_turn] == 0)] = -10  # draws
+            agent.update_q_values(states[agent_turn], actions[agent_turn], rewards, next_keys[agent_turn])
+            total_rewards[agent_turn] += rewards
+
+        for i in np.flatnonzero(done):
+            wins.append(1 if winners[i] == X_CODE else 0)
+            agent.decay_epsilon()
+            agent.training_data.append(float(total_rewards[i]))
+        total_rewards[done] = 0
+        env.reset(done)
+    return wins[:episodes]
+
+
+# avaliação em lote, com os mesmos números de QLearningAIPlayer.evaluate_agent
+def evaluate_batch_agent(agent, num_games=100, num_envs=256, opponent=random_policy):
+    if num_games == 0:
+        return {'win_rate': 0, 'avg_score': 0, 'avg_moves': 0}
+
+    # em levas de até num_envs jogos; cada jogo da leva conta só a primeira partida,
+    # senão as partidas curtas (que terminam antes) ficariam super-representadas
+    winners_list = []
+    lengths = []
+    while len(winners_list) < num_games:
+        env = VecTwixtEnv(min(num_envs, num_games - len(winners_list)))
+        finished = np.zeros(env.num_envs, dtype=bool)
+        while not finished.all():
+            _, actions = play_turn(env, agent, opponent, training_mode=False)
+            moves = env.moves + 1
+            _, winners, done = env.step(actions)
+            first = done & ~finished
+            winners_list.extend(winners[first])
+            lengths.extend(moves[first])
+            finished |= done
+
+    winners = np.array(winners_list)
+    scores = np.where(winners == X_CODE, WIN_SCORE, np.where(winners == O_CODE, -WIN_SCORE, 0))
+    return {
+        'win_rate': float(np.mean(winners == X_CODE)),
+        'avg_score': float(scores.mean()),
+        'avg_moves': float(np.mean(lengths))
+    }